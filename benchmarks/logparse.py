@@ -0,0 +1,100 @@
+"""
+Log parsing microbenchmark.
+
+Compares the old per-cog parsing (every cog running its own re.findall on
+every line, and LogPlayers running two findall passes over the whole text)
+with util.logevents, which reads the category tag once and runs at most one
+precompiled pattern per line.
+
+    python -m benchmarks.logparse --lines 200000
+    python -m benchmarks.logparse --corpus /path/to/TheIsle-Shipping.log
+"""
+import argparse
+import random
+import re
+import time
+from util.logevents import parse_log_lines
+
+NOISE = [
+    "[{ts}][{frame:3d}]LogNet: NotifyAcceptingConnection accepted from: 10.0.{a}.{b}:7777",
+    "[{ts}][{frame:3d}]LogNet: Warning: UNetConnection::Tick: Connection TIMED OUT. Closing connection..",
+    "[{ts}][{frame:3d}]LogOnline: OSS: Created online subsystem instance for: EOS",
+    "[{ts}][{frame:3d}]LogTemp: Warning: Character {a} has no valid spawn point, retrying",
+    "[{ts}][{frame:3d}]LogStreaming: Display: Flushing async loaders.",
+    "[{ts}][{frame:3d}]LogAIModule: Creating AISystem for world Gateway",
+    "[{ts}][{frame:3d}][LogTheIsleServer]: Saving world state ({a} actors)",
+]
+EVENTS = [
+    "[{ts}][{frame:3d}][LogTheIsleChatData]: [Global] [Group{a}] Player{a} [7656119800000{b:04d}]: gg {b}",
+    "[{ts}][{frame:3d}][LogTheIsleChatData]: [Spatial] [Group{a}] Player{a} [7656119800000{b:04d}]: over here",
+    "[{day}][LogTheIsleKillData]: Player{a} [7656119800000{a:04d}] Dino: Carno, Male, 0.75 - Killed the following player: Player{b}, [7656119800000{b:04d}], Dino: Dryo, Female, 0.40, at location X=1",
+    "[{day}][LogTheIsleKillData]: Player{a} [7656119800000{a:04d}] Dino: Stego, Female, 1.00 - Died from Natural cause",
+    "[{ts}][{frame:3d}][LogTheIsleCommandData]: Admin{a} [7656119800000{a:04d}] used command: Heal at: Player{b}, [7656119800000{b:04d}], Class: Tenontosaurus, Gender: Male, Previous value: 10.0, New value: 100.0%",
+    "[{ts}][{frame:3d}][LogTheIsleServer]: [Player Connecting .. Steam_Id: 7656119800000{a:04d}, EOS_Id: 0002{a:028x}]",
+    "[{ts}][{frame:3d}][LogTheIsleJoinData]: Player{a} [7656119800000{a:04d}] Joined The Server",
+]
+
+def generate_corpus(lines, event_share, seed=1):
+    rng = random.Random(seed)
+    out = []
+    for index in range(lines):
+        template = rng.choice(EVENTS) if rng.random() < event_share else rng.choice(NOISE)
+        out.append(template.format(
+            ts=f"2024.10.15-12.{index // 6000 % 60:02d}.{index // 100 % 60:02d}:{index % 1000:03d}",
+            day="2024.10.15-12.00.00",
+            frame=index % 1000,
+            a=rng.randrange(10000),
+            b=rng.randrange(10000),
+        ))
+    return "\n".join(out) + "\n"
+
+# The patterns and call pattern the cogs used before the shared tailer.
+OLD_CHAT = r"\[LogTheIsleChatData\]: \[(.*?)\] \[(.*?)\] (.*?) \[(\d+)\]: (.*)"
+OLD_KILL = r"\[([\d\.\-]+)\]\[LogTheIsleKillData\]: (.*?) \[(\d+)\] Dino: (.*?), (Male|Female), \d+\.\d+ - (Died from Natural cause|Killed the following player: (.*?), \[(\d+)\], Dino: (.*?),)"
+OLD_ADMIN = r"\[LogTheIsleCommandData\]: (.*?) \[(\d+)\] used command: (.*?)(?: at: (.*?), \[(\d+)\], Class: (.*?), Gender: (.*?), Previous value: (.*?), New value: (.*?)%)?$"
+OLD_CONNECT = r"\[LogTheIsleServer\]: \[Player Connecting .. Steam_Id: (\d+)\s*,\s*EOS_Id: (\w+)\]"
+OLD_JOIN = r"\[LogTheIsleJoinData\]: (\w+) \[\d+\] Joined The Server"
+
+def old_parse(text):
+    found = 0
+    lines = text.strip().splitlines()
+    for pattern in (OLD_CHAT, OLD_KILL, OLD_ADMIN):
+        for line in lines:
+            found += len(re.findall(pattern, line + '\n'))
+    found += len(re.findall(OLD_CONNECT, text)) + len(re.findall(OLD_JOIN, text))
+    return found
+
+def new_parse(text):
+    return sum(1 for _ in parse_log_lines(text))
+
+def bench(name, func, text, line_count, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        found = func(text)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{name:<32} {line_count / best:12,.0f} lines/s  ({best * 1000:8.1f}ms, {found} events)")
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark log line classification.")
+    parser.add_argument("--lines", type=int, default=200000, help="size of the generated corpus")
+    parser.add_argument("--event-share", type=float, default=0.05, help="share of lines carrying an event tag")
+    parser.add_argument("--corpus", help="parse this log file instead of a generated one")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.corpus:
+        with open(args.corpus, "r", encoding="utf-8", errors="replace") as file:
+            text = file.read()
+    else:
+        text = generate_corpus(args.lines, args.event_share)
+    line_count = text.count("\n")
+    print(f"{line_count} lines, {len(text) / 1024 / 1024:.1f} MB")
+    old = bench("per-cog findall (before)", old_parse, text, line_count, args.repeat)
+    new = bench("tag dispatch (util.logevents)", new_parse, text, line_count, args.repeat)
+    print(f"speedup x{old / new:.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+/find lookup benchmark.
+
+Compares the old search (every name, EOS ID and Steam ID of players.json
+tested in turn) with util.playersearch on a generated player base.
+
+    python -m benchmarks.playersearch --players 500000
+"""
+import argparse
+import random
+import time
+from util.playersearch import PlayerSearchIndex
+
+SYLLABLES = ["ra", "tor", "dino", "rex", "ka", "zu", "mi", "lo", "sa", "ur", "pe", "tri", "stego", "nox", "vel"]
+
+def generate_players(count, seed=1):
+    rng = random.Random(seed)
+    players = []
+    for index in range(count):
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randrange(2, 5))).title() + str(rng.randrange(1000))
+        players.append((name, f"{rng.getrandbits(128):032x}", str(76561197960265728 + rng.randrange(10 ** 9))))
+    return players
+
+def old_find(players, term):
+    return [
+        player for player in players
+        if term.lower() in player[0].lower() or term in player[1] or term in player[2]
+    ]
+
+def bench(name, func, queries, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for query in queries:
+            func(query)
+        elapsed = (time.perf_counter() - started) / len(queries)
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{name:<30} {best * 1000:9.3f}ms per query")
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the /find player search.")
+    parser.add_argument("--players", type=int, default=500000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    players = generate_players(args.players)
+    started = time.perf_counter()
+    index = PlayerSearchIndex()
+    index.extend(players)
+    print(f"{len(players)} players, index built in {time.perf_counter() - started:.2f}s")
+
+    rng = random.Random(2)
+    sample = [rng.choice(players) for _ in range(args.queries)]
+    queries = {
+        "name part": [name[1:5] for name, _, _ in sample],
+        "name prefix": [name[:3] for name, _, _ in sample],
+        "Steam ID": [steam_id for _, _, steam_id in sample],
+        "EOS ID prefix": [eos_id[:8] for _, eos_id, _ in sample],
+    }
+    for kind, terms in queries.items():
+        print(kind)
+        old = bench("  full scan (before)", lambda term: old_find(players, term), terms[:5], 1)
+        new = bench("  PlayerSearchIndex", lambda term: index.search(term, 25), terms, args.repeat)
+        print(f"  speedup x{old / new:,.0f}")
+
+if __name__ == "__main__":
+    main()
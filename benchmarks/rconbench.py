@@ -0,0 +1,100 @@
+"""
+RCON load benchmark against the fake Evrima server in tools/fakercon.py.
+
+Measures, for each population size, the DinoTracker tick, the monitor's
+server details refresh and admin command latency both idle and while a
+DinoTracker tick is running.
+
+    python -m benchmarks.rconbench --players 10,100,500 --latency 0.005
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import statistics
+import time
+from types import SimpleNamespace
+from tools.fakercon import FakeEvrimaServer
+from util.rcon import RconPool, RCON_KICKPLAYER, PRIORITY_INTERACTIVE
+from util.serverinfo import ServerDetailsCache
+from util.snapshot import take_player_snapshot
+
+try:
+    from cogs.logging.dinotracking import DinoTracker
+except ImportError:
+    DinoTracker = None
+
+def summarize(samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return f"p50 {statistics.median(samples) * 1000:8.1f}ms  p95 {p95 * 1000:8.1f}ms"
+
+async def run_tick(pool):
+    if DinoTracker is None:
+        # Without nextcord installed only the RCON side of the tick is measured.
+        await take_player_snapshot(pool)
+        return
+    server = SimpleNamespace(name="bench", rcon=pool, channels={"dinotracker": 0})
+    # The cog prints every step; keep that out of the timings.
+    with contextlib.redirect_stdout(io.StringIO()):
+        tracker = DinoTracker(SimpleNamespace(servers=[server]))
+        await tracker.update_server_players(server)
+
+async def timed(coro_factory, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await coro_factory()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+async def bench_population(args, players):
+    server = FakeEvrimaServer(
+        players=players, latency=args.latency, jitter=args.jitter,
+        bulk_player_data=not args.no_bulk, seed=players
+    )
+    await server.start()
+    pool = RconPool("127.0.0.1", server.port, server.password, size=args.pool_size, rate=args.rate, opcode_limits={0x77: 1})
+    details = ServerDetailsCache(pool)
+
+    async def kick():
+        await pool.send(RCON_KICKPLAYER, "0,benchmark", priority=PRIORITY_INTERACTIVE)
+
+    try:
+        tick = await timed(lambda: run_tick(pool), args.iterations)
+        refresh = await timed(lambda: details.get(max_age=0), args.iterations * 5)
+        idle_kick = await timed(kick, args.iterations * 5)
+
+        background = asyncio.ensure_future(run_tick(pool))
+        await asyncio.sleep(0)
+        loaded_kick = await timed(kick, args.iterations * 5)
+        await background
+    finally:
+        await pool.close()
+        await server.stop()
+
+    print(f"{players} players (bulk player data: {not args.no_bulk})")
+    print(f"  DinoTracker tick    {summarize(tick)}")
+    print(f"  Monitor refresh     {summarize(refresh)}")
+    print(f"  Kick, idle          {summarize(idle_kick)}")
+    print(f"  Kick, during tick   {summarize(loaded_kick)}")
+    print(f"  TCP connections {server.connections}, logins {server.logins}, commands {sum(server.commands.values())}")
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark the bot's RCON usage against a fake Evrima server.")
+    parser.add_argument("--players", default="10,100,500", help="comma separated population sizes")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.005, help="seconds the fake server waits before replying")
+    parser.add_argument("--jitter", type=float, default=0.002)
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--rate", type=float, default=0)
+    parser.add_argument("--no-bulk", action="store_true", help="make the server refuse bulk player data")
+    args = parser.parse_args()
+
+    if DinoTracker is None:
+        print("nextcord is not installed, DinoTracker tick measures the player snapshot only.")
+    for players in (int(value) for value in args.players.split(",")):
+        await bench_population(args, players)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+"""
+Event loop lag while the SFTP host hangs.
+
+Starts a tarpit that accepts TCP connections but never sends an SSH banner,
+the way an overloaded or half-dead host behaves, and reads the log through
+it for a while. This is done twice: once with the handshake on the event loop
+(how the log cogs used to connect) and once through SftpPool, which keeps
+all paramiko work on its own threads. The loop lag percentiles show how
+long Discord heartbeats and slash commands would have been stalled.
+
+    python -m benchmarks.sftplag --duration 10 --timeout 2
+"""
+import argparse
+import asyncio
+import logging
+import socket
+import paramiko
+from util.health import EndpointHealth
+from util.looplag import LoopLagMonitor
+from util.sftp import SftpPool
+
+def start_tarpit():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    # Never accepted: the kernel completes the TCP handshake and nothing else happens.
+    sock.listen(128)
+    return sock
+
+def read_log(sftp, path):
+    with sftp.file(path, "r") as file:
+        return file.read()
+
+async def inline_read(host, port, timeout):
+    transport = paramiko.Transport((host, port))
+    transport.banner_timeout = timeout
+    try:
+        transport.connect(username="bench", password="bench")
+    finally:
+        transport.close()
+
+async def measure(name, read, duration):
+    monitor = LoopLagMonitor(interval=0.01, warn_threshold=0)
+    monitor.start()
+    attempts = 0
+    loop = asyncio.get_event_loop()
+    ends_at = loop.time() + duration
+    while loop.time() < ends_at:
+        attempts += 1
+        try:
+            await read()
+        except Exception:
+            pass
+        await asyncio.sleep(0.05)
+    monitor.stop()
+    stats = monitor.stats()
+    print(
+        f"{name:<22} attempts {attempts:3d}  loop lag "
+        f"p50 {stats['p50'] * 1000:7.1f}ms  p95 {stats['p95'] * 1000:7.1f}ms  max {stats['max'] * 1000:7.1f}ms"
+    )
+
+async def main():
+    parser = argparse.ArgumentParser(description="Measure event loop lag while the SFTP host does not answer.")
+    parser.add_argument("--duration", type=float, default=10, help="seconds to run each mode")
+    parser.add_argument("--timeout", type=float, default=2, help="SSH banner/connect timeout in seconds")
+    args = parser.parse_args()
+    # paramiko logs a traceback for every banner timeout.
+    logging.getLogger("paramiko").setLevel(logging.CRITICAL)
+
+    tarpit = start_tarpit()
+    host, port = tarpit.getsockname()
+    # Never trip the breaker so every attempt really touches the network.
+    pool = SftpPool(host, port, "bench", "bench", size=2, timeout=args.timeout,
+                    health=EndpointHealth("bench", failure_threshold=10 ** 9))
+    try:
+        await measure("handshake on the loop", lambda: inline_read(host, port, args.timeout), args.duration)
+        await measure("SftpPool", lambda: pool.run(read_log, "/TheIsle-Shipping.log"), args.duration)
+    finally:
+        await pool.close()
+        tarpit.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,145 +1,111 @@
 import nextcord
 from nextcord.ext import commands, tasks
-import paramiko
-import os
-import json
-import re
-import asyncio
-from util.config import FTP_HOST, FTP_PASS, FTP_PORT, FTP_USER
-from util.config import ENABLE_LOGGING, FILE_PATH
+from util import config
+from util.config import ENABLE_LOGGING
+from util.backfill import Backfill
+from util.history import EventHistory
+from util.logevents import ConnectEvent, JoinEvent
+from util.offsets import OffsetStore
+from util.players import PlayerPairing
 
 class LogPlayers(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.ftp_host = FTP_HOST
-        self.ftp_port = FTP_PORT
-        self.ftp_username = FTP_USER
-        self.ftp_password = FTP_PASS
-        self.filepath = FILE_PATH
-        self.json_file = "players.json"
+        self.registry = self.bot.players
+        self.backfill_state = OffsetStore(config.BACKFILL_STATE_FILE)
+        self.history = EventHistory(config.HISTORY_DB)
+        self.backfill_running = False
+        # Connecting players waiting for their join line (or the other way round).
+        self.pairing = {
+            server.name: PlayerPairing(pending=self.registry.pending(server.name)) for server in self.bot.servers
+        }
+        for server in self.bot.servers:
+            # Without a saved log offset the backlog holds everyone who joined before the bot started.
+            # The players are committed before the log offset moves past their lines.
+            server.log.subscribe((ConnectEvent, JoinEvent), self.record_event, backlog=True, commit=self.commit_players)
         self.update_task = self.update_players_background.start()
 
     def cog_unload(self):
         self.update_task.cancel()
+        for server in self.bot.servers:
+            server.log.unsubscribe(self.record_event)
+        self.registry.save()
+        self.history.close()
+
+    async def record_event(self, server, event):
+        player = self.pairing[server.name].add(event)
+        if player is not None:
+            self.registry.upsert(*player)
+
+    def commit_players(self, server):
+        self.registry.save_pending(server.name, self.pairing[server.name].pending)
+        self.registry.save()
 
     @tasks.loop(minutes=5)
     async def update_players_background(self):
-        file_content = await self.async_sftp_operation(self.read_file, self.filepath)
-        if file_content is not None:
-            player_data = self.parse_log_file(file_content)
-            # print(f"Parsed player data: {player_data}")
-            self.update_json(player_data)
+        if self.registry.save():
             print("Player data updated automatically.")
-        else:
-            print("Failed to connect to SFTP server.")
 
     @update_players_background.before_loop
     async def before_update_players(self):
         await self.bot.wait_until_ready()
-
-    async def async_sftp_operation(self, operation, *args, **kwargs):
-        loop = asyncio.get_event_loop()
-        with paramiko.Transport((self.ftp_host, self.ftp_port)) as transport:
-            transport.connect(username=self.ftp_username, password=self.ftp_password)
-            sftp = paramiko.SFTPClient.from_transport(transport)
-            try:
-                result = await loop.run_in_executor(None, operation, sftp, *args, **kwargs)
-                return result
-            finally:
-                sftp.close()
-
-    def read_file(self, sftp, filepath):
-        with sftp.file(filepath, "r") as file:
-            file_content = file.read().decode()
-        # print(f"Read file content: {file_content[:200]}...")
-        return file_content
-
-    def parse_log_file(self, file_content):
-        pattern_steam_eos = r"\[LogTheIsleServer\]: \[Player Connecting .. Steam_Id: (\d+)\s*,\s*EOS_Id: (\w+)\]"
-        pattern_name = r"\[LogTheIsleJoinData\]: (\w+) \[\d+\] Joined The Server"
-
-        steam_eos_matches = re.findall(pattern_steam_eos, file_content)
-        name_matches = re.findall(pattern_name, file_content)
-
-        player_data = []
-        seen = set()
-
-        for (steam_id, eos_id), name in zip(steam_eos_matches, name_matches):
-            if (eos_id, steam_id) not in seen:
-                seen.add((eos_id, steam_id))
-                player_data.append({
-                    "Name": name,
-                    "EOS_Id": eos_id,
-                    "Steam_Id": steam_id
-                })
-                # print(f"Recorded player: Name={name}, EOS_Id={eos_id}, Steam_Id={steam_id}")
-                
-        return player_data
-
-    def update_json(self, player_data):
-        data_folder = "data"
-        json_file = os.path.join(data_folder, "players.json")
-
-        os.makedirs(data_folder, exist_ok=True)
-
-        try:
-            with open(json_file, "r+", encoding="utf-8") as file:
-                existing_data = json.load(file)
-                updated_data = existing_data.copy()
-
-                for new_entry in player_data:
-                    if not any(player['EOS_Id'] == new_entry['EOS_Id'] and player['Steam_Id'] == new_entry['Steam_Id'] for player in existing_data):
-                        updated_data.append(new_entry)
-                        # print(f"Added new player entry: {new_entry}")
-
-                file.seek(0)
-                file.truncate()
-                json.dump(updated_data, file, indent=4)
-
-        except FileNotFoundError:
-            with open(json_file, "w", encoding="utf-8") as file:
-                json.dump(player_data, file, indent=4)
-                # print(f"Created new players file with initial data: {player_data}")
+        for server in self.bot.servers:
+            server.log.start()
 
     @commands.command(description="Manually update the player database.")
     @commands.is_owner()
     async def updateplayers(self, ctx):
-        file_content = await self.async_sftp_operation(self.read_file, self.filepath)
-        if file_content is not None:
-            player_data = self.parse_log_file(file_content)
-            print(f"Manually parsed player data: {player_data}")
-            self.update_json(player_data)
-            await ctx.send("Player data updated.")
-        else:
-            await ctx.send("Failed to connect to SFTP server.")
+        self.registry.save()
+        await ctx.send(f"Player data updated. {self.registry.count()} players in the database.")
 
-    @commands.command(description="Manually list all players in the database.")
+    @commands.command(description="Import players, kills and chat from the rotated logs of a server.")
     @commands.is_owner()
-    async def listplayers(self, ctx):
-        data_folder = "data"
-        json_file = os.path.join(data_folder, "players.json")
-
+    async def backfill(self, ctx, *, server_name=None):
         try:
-            with open(json_file, "r", encoding="utf-8") as file:
-                players = json.load(file)
-                if not players:
-                    await ctx.send("No players found in the database.")
-                    return
-
-                message = "Player List:\n"
-                for player in players:
-                    new_line = f"Name: {player['Name']}, EOSID: {player['EOS_Id']}, SteamID64: {player['Steam_Id']}\n"
-                    if len(message) + len(new_line) > 2000:
-                        await ctx.send(message)
-                        message = "Player List Continued:\n"
-
-                    message += new_line
-
-                if message:
-                    await ctx.send(message)
+            server = self.bot.servers.get(server_name)
+        except KeyError:
+            await ctx.send(f"Unknown server {server_name}.")
+            return
+        if self.backfill_running:
+            await ctx.send("A backfill is already running.")
+            return
+        self.backfill_running = True
+        await ctx.send(f"Backfilling the rotated logs of {server.name}...")
+        try:
+            job = Backfill(
+                server,
+                self.registry,
+                self.history,
+                self.backfill_state,
+                concurrency=config.BACKFILL_CONCURRENCY,
+                workers=config.BACKFILL_WORKERS,
+                timeout=config.SFTP_TIMEOUT
+            )
+            await ctx.send(await job.run())
+        except Exception as e:
+            await ctx.send(f"Backfill failed: {e}")
+        finally:
+            self.backfill_running = False
 
-        except FileNotFoundError:
-            await ctx.send("Players database not found.")
+    @commands.command(description="Manually list all players in the database.")
+    @commands.is_owner()
+    async def listplayers(self, ctx):
+        self.registry.save()
+        if not self.registry.count():
+            await ctx.send("No players found in the database.")
+            return
+
+        message = "Player List:\n"
+        for player in self.registry.all():
+            new_line = f"Name: {player['Name']}, EOSID: {player['EOS_Id']}, SteamID64: {player['Steam_Id']}\n"
+            if len(message) + len(new_line) > 2000:
+                await ctx.send(message)
+                message = "Player List Continued:\n"
+
+            message += new_line
+
+        if message:
+            await ctx.send(message)
 
 def setup(bot):
     if ENABLE_LOGGING:
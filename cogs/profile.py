@@ -3,11 +3,13 @@ from nextcord.ext import commands
 import json
 import os
 
+FIND_LIMIT = 25
+
 class PlayerProfileLinker(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.data_folder = "data"
-        self.players_file = os.path.join(self.data_folder, "players.json")
+        self.players = bot.players
         self.linked_accounts_file = os.path.join(self.data_folder, "linked_accounts.json")
         os.makedirs(self.data_folder, exist_ok=True)
 
@@ -15,13 +17,7 @@ class PlayerProfileLinker(commands.Cog):
     async def linkaccount(self, interaction: nextcord.Interaction, steam_id: str):
         discord_id = str(interaction.user.id)
 
-        if not os.path.exists(self.players_file):
-            await interaction.response.send_message("The players database is not available.")
-            return
-
-        with open(self.players_file, "r", encoding="utf-8") as file:
-            players_data = json.load(file)
-            player_profile = next((player for player in players_data if player["Steam_Id"] == steam_id), None)
+        player_profile = self.players.by_steam_id(steam_id)
 
         if not player_profile:
             await interaction.response.send_message("No player found with the provided SteamID64.")
@@ -87,36 +83,25 @@ class PlayerProfileLinker(commands.Cog):
 
     @nextcord.slash_command(name="find", description="Find a player by name, EOS ID, or SteamID64")
     async def findplayer(self, interaction: nextcord.Interaction, search_term: str):
-        data_folder = "data"
-        json_file = os.path.join(data_folder, "players.json")
-
-        try:
-            with open(json_file, "r", encoding="utf-8") as file:
-                players = json.load(file)
-                found_players = []
-
-                for player in players:
-                    if search_term.lower() in player['Name'].lower() or \
-                    search_term in player['EOS_Id'] or \
-                    search_term in player['Steam_Id']:
-                        found_players.append(player)
-
-                if found_players:
-                    message = "Found Players:\n"
-                    for player in found_players:
-                        new_line = f"Name: {player['Name']}, EOSID: {player['EOS_Id']}, SteamID64: {player['Steam_Id']}\n"
-                        if len(message) + len(new_line) > 2000:
-                            await interaction.response.send_message(message)
-                            message = "Player List Continued:\n"
-
-                        message += new_line
-
-                    await interaction.response.send_message(message, ephemeral=True)
-                else:
-                    await interaction.response.send_message("No players found with that search term.", ephemeral=True)
-
-        except FileNotFoundError:
-            await interaction.response.send_message("Players database not found.", ephemeral=True)
+        found_players = self.players.find(search_term, limit=FIND_LIMIT)
+
+        if found_players:
+            messages = []
+            message = "Found Players:\n"
+            for player in found_players:
+                new_line = f"Name: {player['Name']}, EOSID: {player['EOS_Id']}, SteamID64: {player['Steam_Id']}\n"
+                if len(message) + len(new_line) > 2000:
+                    messages.append(message)
+                    message = "Player List Continued:\n"
+
+                message += new_line
+            messages.append(message)
+
+            await interaction.response.send_message(messages[0], ephemeral=True)
+            for message in messages[1:]:
+                await interaction.followup.send(message, ephemeral=True)
+        else:
+            await interaction.response.send_message("No players found with that search term.", ephemeral=True)
 
 def setup(bot):
     cog = PlayerProfileLinker(bot)
@@ -1,11 +1,9 @@
 import nextcord
 from nextcord.ext import commands
-import paramiko
-import asyncio
 import io
 from collections import defaultdict
-from util.config import FTP_HOST, FTP_PASS, FTP_PORT, FTP_USER
-from util.config import ENABLE_INJECTIONS, ADMIN_FILE_PATH
+from util.config import ENABLE_INJECTIONS
+from util.servers import server_option
 
 class MultiKeyConfigParser:
     def __init__(self):
@@ -40,67 +38,53 @@ class MultiKeyConfigParser:
 class GameIniAdminManager(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.ftp_host = FTP_HOST
-        self.ftp_port = FTP_PORT
-        self.ftp_username = FTP_USER
-        self.ftp_password = FTP_PASS
-        self.ini_file_path = ADMIN_FILE_PATH
 
     @nextcord.slash_command(name="addadmin", description="Add admin to the server.", default_member_permissions=nextcord.Permissions(administrator=True), dm_permission=False)
-    async def addadmin(self, interaction: nextcord.Interaction, steam_id: str):
-        if await self.modify_admins(steam_id, add=True):
+    async def addadmin(self, interaction: nextcord.Interaction, steam_id: str, server: str = server_option()):
+        if await self.modify_admins(self.bot.servers.get(server), steam_id, add=True):
             await interaction.response.send_message(f"Admin {steam_id} added successfully.", ephemeral=True)
         else:
             await interaction.response.send_message("Failed to add admin.", ephemeral=True)
 
     @nextcord.slash_command(description="Remove admin from the server.", default_member_permissions=nextcord.Permissions(administrator=True), dm_permission=False)
-    async def removeadmin(self, interaction: nextcord.Interaction, steam_id: str):
-        if await self.modify_admins(steam_id, add=False):
+    async def removeadmin(self, interaction: nextcord.Interaction, steam_id: str, server: str = server_option()):
+        if await self.modify_admins(self.bot.servers.get(server), steam_id, add=False):
             await interaction.response.send_message(f"Admin {steam_id} removed successfully.", ephemeral=True)
         else:
             await interaction.response.send_message("Failed to remove admin.", ephemeral=True)
 
-    async def modify_admins(self, steam_id, add=True):
-        loop = asyncio.get_running_loop()
+    async def modify_admins(self, server, steam_id, add=True):
         try:
-            return await loop.run_in_executor(None, self._modify_admins_sync, steam_id, add)
+            return await server.sftp.run(self._modify_admins_sync, server.admin_file_path, steam_id, add)
         except Exception as e:
             print(f"Error: {e}")
             return False
 
-    def _modify_admins_sync(self, steam_id, add):
-        transport = paramiko.Transport((self.ftp_host, self.ftp_port))
-        transport.connect(username=self.ftp_username, password=self.ftp_password)
-        sftp = paramiko.SFTPClient.from_transport(transport)
+    def _modify_admins_sync(self, sftp, ini_file_path, steam_id, add):
+        with sftp.open(ini_file_path, "r") as file:
+            file_content = file.read().decode()
 
-        try:
-            with sftp.open(self.ini_file_path, "r") as file:
-                file_content = file.read().decode()
-
-            config = MultiKeyConfigParser()
-            config.read_string(file_content)
+        config = MultiKeyConfigParser()
+        config.read_string(file_content)
 
-            admin_section = '/Script/TheIsle.TIGameStateBase'
-            admin_key = 'AdminsSteamIDs'
-            admins = config.get(admin_section, admin_key)
+        admin_section = '/Script/TheIsle.TIGameStateBase'
+        admin_key = 'AdminsSteamIDs'
+        admins = config.get(admin_section, admin_key)
 
-            if add:
-                if steam_id not in admins:
-                    admins.append(steam_id)
-            else:
-                if steam_id in admins:
-                    admins.remove(steam_id)
+        if add:
+            if steam_id not in admins:
+                admins.append(steam_id)
+        else:
+            if steam_id in admins:
+                admins.remove(steam_id)
 
-            config.set(admin_section, admin_key, admins)
+        config.set(admin_section, admin_key, admins)
 
-            new_file_content = config.to_string()
+        new_file_content = config.to_string()
 
-            with sftp.open(self.ini_file_path, "w") as file:
-                file.write(new_file_content)
-            return True
-        finally:
-            sftp.close()
-            transport.close()
+        with sftp.open(ini_file_path, "w") as file:
+            file.write(new_file_content)
+        return True
 
 def setup(bot):
     if ENABLE_INJECTIONS:
@@ -1,16 +1,14 @@
 import nextcord
 from nextcord.ext import commands
-from gamercon_async import EvrimaRCON
-from util.config import RCON_HOST, RCON_PORT, RCON_PASS, ENABLE_CHAT_COMMANDS
+from util.config import ENABLE_CHAT_COMMANDS
+from util.rcon import RCON_GETPLAYERLIST, RCON_DIRECTMESSAGE
+from util.parsers import parse_player_list
 import logging
 import re
 
 class ChatCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.rcon_host = RCON_HOST
-        self.rcon_password = RCON_PASS
-        self.rcon_port = RCON_PORT
         logging.info("ChatCommands cog initialized")
     
     @commands.Cog.listener()
@@ -31,16 +29,21 @@ class ChatCommands(commands.Cog):
             # Process !slay command
             if chat_message.strip().lower() == "!slay":
                 logging.info(f"Player {player_name} used !slay command")
-                await self.process_slay_command(player_name, message.channel)
+                await self.process_slay_command(self.server_for_channel(message.channel.id), player_name, message.channel)
     
-    async def process_slay_command(self, player_name, response_channel):
+    def server_for_channel(self, channel_id):
+        """The server whose chat feed posts into this channel, or the default server"""
+        servers = self.bot.servers
+        return servers.by_channel('chatlog', channel_id) or servers.by_channel('spatialchat', channel_id) or servers.default
+    
+    async def process_slay_command(self, server, player_name, response_channel):
         try:
             # First get the player list to find their ID
-            player_id = await self.find_player_id(player_name)
+            player_id = await self.find_player_id(server, player_name)
             
             if player_id:
                 # Execute the kill command via RCON
-                result = await self.kill_player(player_id)
+                result = await self.kill_player(server, player_id)
                 await response_channel.send(f"Processed !slay command for {player_name} (ID: {player_id}). Result: {result}")
             else:
                 await response_channel.send(f"Could not find player ID for {player_name}")
@@ -48,37 +51,29 @@ class ChatCommands(commands.Cog):
             logging.error(f"Error processing !slay: {str(e)}")
             await response_channel.send(f"Error processing !slay command: {str(e)}")
     
-    async def find_player_id(self, player_name):
+    async def find_player_id(self, server, player_name):
         """Get player ID from player name using RCON playerlist command"""
-        command = b'\x02' + b'\x40' + b'\x00'  # playerlist command
-        response = await self.run_rcon(command)
+        response = await self.run_rcon(server, RCON_GETPLAYERLIST)
         
         if not response:
             return None
             
-        # Parse the player list to find the player ID
-        # The format varies, but usually includes name and ID pairs
-        # Example: PlayerName(ID: 12345678)
-        player_pattern = re.compile(rf"{re.escape(player_name)}\s*$ID:\s*(\d+)$")
-        matches = player_pattern.findall(response)
-        
-        if matches:
-            return matches[0]  # Return the first matching ID
+        # Return the first player whose name matches
+        for entry in parse_player_list(response):
+            if entry.name == player_name:
+                return entry.steam_id
         return None
     
-    async def kill_player(self, player_id):
+    async def kill_player(self, server, player_id):
         """Execute the kill player command via RCON"""
         # The exact command may vary based on your game server
         # For The Isle/Evrima, we assume this format:
         # Note: Verify the correct RCON command format for killing a player in your game
-        command = b'\x02' + b'\x11' + f"{player_id}".encode() + b'\x00'
-        return await self.run_rcon(command)
+        return await self.run_rcon(server, RCON_DIRECTMESSAGE, f"{player_id}")
     
-    async def run_rcon(self, command):
+    async def run_rcon(self, server, opcode, payload=b''):
         try:
-            rcon = EvrimaRCON(self.rcon_host, self.rcon_port, self.rcon_password)
-            await rcon.connect()
-            return await rcon.send_command(command)
+            return await server.rcon.send(opcode, payload)
         except Exception as e:
             logging.error(f"Error running RCON command: {e}")
             return None
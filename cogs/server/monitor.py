@@ -1,102 +1,55 @@
 import nextcord
 from nextcord.ext import commands, tasks
-from util.config import RCON_HOST, RCON_PORT, RCON_PASS
-from gamercon_async import EvrimaRCON
-from util.functions import saveserverinfo, loadserverinfo
+from util.config import MONITOR_EDIT_CONCURRENCY
+from util.functions import saveserverinfo, loadallserverinfo
+from util.rcon import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE
+from util.servers import server_option
+import asyncio
 import pytz
 import datetime
-import re
 
 class EvrimaMonitorCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.rcon_host = RCON_HOST
-        self.rcon_port = RCON_PORT
-        self.rcon_password = RCON_PASS
         self.update_server_info.start()
         self.update_bot_activity.start()
 
     def create_embed(self, server_info):
         embed_icon="https://cdn.discordapp.com/attachments/855527844670865438/1301430943235706942/communityIcon_nmgut76oq1461.png?ex=67247384&is=67232204&hm=f78ed1501ba5f5148b92451d9198be77f6f8be01c365d1be24079136365138c7&"
         embed_timestamp = pytz.utc.localize(datetime.datetime.utcnow()).astimezone(pytz.timezone('US/Central')).strftime('%Y-%m-%d %H:%M:%S')
-        embed = nextcord.Embed(title=server_info.get("ServerDetailsServerName", "N/A"), color=nextcord.Color.blurple())
+        embed = nextcord.Embed(title=server_info.name, color=nextcord.Color.blurple())
         embed.set_author(name="Server Info", icon_url=embed_icon)
-        embed.add_field(name="Players", value=f"{server_info.get('ServerCurrentPlayers', 0)}/{server_info.get('ServerMaxPlayers', 0)}", inline=False)
-        embed.add_field(name="Map", value=server_info.get("ServerMap", "N/A"), inline=False)
-        embed.add_field(name="Day Length", value=f"{server_info.get('ServerDayLengthMinutes', 0)} minutes", inline=False)
-        embed.add_field(name="Night Length", value=f"{server_info.get('ServerNightLengthMinutes', 0)} minutes", inline=False)
+        embed.add_field(name="Players", value=f"{server_info.current_players}/{server_info.max_players}", inline=False)
+        embed.add_field(name="Map", value=server_info.map, inline=False)
+        embed.add_field(name="Day Length", value=f"{server_info.day_length} minutes", inline=False)
+        embed.add_field(name="Night Length", value=f"{server_info.night_length} minutes", inline=False)
         embed.set_thumbnail(url=embed_icon)
         embed.set_footer(text=f"Last updated: {embed_timestamp}", icon_url=embed_icon)
         
         return embed
 
-    async def get_server_info(self):
-        try:
-            rcon = EvrimaRCON(self.rcon_host, self.rcon_port, self.rcon_password)
-            await rcon.connect()
-            command = b'\x02' + b'\x12' + b'\x00'
-            response = await rcon.send_command(command)
-
-            # This regex pattern is used to extract the rcon response into a dictionary.
-            # Not really using all of it but just making sure I extracted it.
-            pattern = (
-                r"ServerDetailsServerName:\s*(.*?), "
-                r"ServerPassword:\s*(.*?), "
-                r"ServerMap:\s*(.*?), "
-                r"ServerMaxPlayers:\s*(-?\d+), "
-                r"ServerCurrentPlayers:\s*(-?\d+), "
-                r"bEnableMutations:\s*(true|false), "
-                r"bEnableHumans:\s*(true|false), "
-                r"bServerPassword:\s*(true|false), "
-                r"bQueueEnabled:\s*(true|false), "
-                r"bServerWhitelist:\s*(true|false), "
-                r"bSpawnAI:\s*(true|false), "
-                r"bAllowRecordingReplay:\s*(true|false), "
-                r"bUseRegionSpawning:\s*(true|false), "
-                r"bUseRegionSpawnCooldown:\s*(true|false), "
-                r"RegionSpawnCooldownTimeSeconds:\s*(-?\d+), "
-                r"ServerDayLengthMinutes:\s*(-?\d+), "
-                r"ServerNightLengthMinutes:\s*(-?\d+), "
-                r"bEnableGlobalChat:\s*(true|false)"
-            )
-            match = re.search(pattern, response)
+    async def get_server_info(self, server=None, priority=PRIORITY_BACKGROUND):
+        return await self.bot.servers.get(server).server_details.get(priority=priority)
 
-            if match:
-                server_info = {
-                    "ServerDetailsServerName": match.group(1),
-                    "ServerPassword": match.group(2),
-                    "ServerMap": match.group(3),
-                    "ServerMaxPlayers": int(match.group(4)),
-                    "ServerCurrentPlayers": int(match.group(5)),
-                    "bEnableMutations": match.group(6) == "true",
-                    "bEnableHumans": match.group(7) == "true",
-                    "bServerPassword": match.group(8) == "true",
-                    "bQueueEnabled": match.group(9) == "true",
-                    "bServerWhitelist": match.group(10) == "true",
-                    "bSpawnAI": match.group(11) == "true",
-                    "bAllowRecordingReplay": match.group(12) == "true",
-                    "bUseRegionSpawning": match.group(13) == "true",
-                    "bUseRegionSpawnCooldown": match.group(14) == "true",
-                    "RegionSpawnCooldownTimeSeconds": int(match.group(15)),
-                    "ServerDayLengthMinutes": int(match.group(16)),
-                    "ServerNightLengthMinutes": int(match.group(17)),
-                    "bEnableGlobalChat": match.group(18) == "true",
-                }
-                return server_info
-            else:
-                print("Pattern did not match the response format.")
-                return None
-        except Exception as e:
-            print(f"Error retrieving server info: {e}")
-            return None
+    async def get_all_server_info(self):
+        """Query every server concurrently, returns {server name: details or None}"""
+        servers = list(self.bot.servers)
+        results = await asyncio.gather(
+            *(server.server_details.get() for server in servers),
+            return_exceptions=True
+        )
+        return {
+            server.name: None if isinstance(result, Exception) else result
+            for server, result in zip(servers, results)
+        }
 
     @tasks.loop(seconds=30)
     async def update_bot_activity(self):
         try:
-            server_info = await self.get_server_info()
-            if server_info:
-                player_count = server_info["ServerCurrentPlayers"]
-                max_players = server_info["ServerMaxPlayers"]
+            online = [info for info in (await self.get_all_server_info()).values() if info]
+            if online:
+                player_count = sum(info.current_players for info in online)
+                max_players = sum(info.max_players for info in online)
                 activity_text = f"Players {player_count}/{max_players}"
                 activity = nextcord.Activity(type=nextcord.ActivityType.watching, name=activity_text)
                 await self.bot.change_presence(activity=activity)
@@ -110,20 +63,31 @@ class EvrimaMonitorCog(commands.Cog):
     @tasks.loop(minutes=5)
     async def update_server_info(self):
         await self.bot.wait_until_ready()
-        for guild in self.bot.guilds:
-            guild_info_list = loadserverinfo(guild.id)
-            if guild_info_list:
-                for guild_info in guild_info_list:
-                    channel = self.bot.get_channel(int(guild_info['channel_id']))
-                    if channel:
-                        try:
-                            message = await channel.fetch_message(int(guild_info['message_id']))
-                            server_info = await self.get_server_info()
-                            if server_info:
-                                embed = self.create_embed(server_info)
-                                await message.edit(embed=embed)
-                        except Exception as e:
-                            print(f"Error updating server info for guild {guild.id}: {e}")
+        # Every server is queried once and its embed rendered once, however many messages show it.
+        all_server_info = await self.get_all_server_info()
+        embeds = {name: self.create_embed(info) for name, info in all_server_info.items() if info}
+        semaphore = asyncio.Semaphore(MONITOR_EDIT_CONCURRENCY)
+        await asyncio.gather(*(
+            self.refresh_message(guild_id, guild_info, embeds, semaphore)
+            for guild_id, guild_info_list in loadallserverinfo().items()
+            for guild_info in guild_info_list
+        ))
+
+    async def refresh_message(self, guild_id, guild_info, embeds, semaphore):
+        channel = self.bot.get_channel(int(guild_info['channel_id']))
+        if not channel:
+            return
+        server_name = guild_info.get('server') or self.bot.servers.default.name
+        embed = embeds.get(server_name)
+        if embed is None:
+            return
+        message_id = int(guild_info['message_id'])
+        async with semaphore:
+            try:
+                # Edited through a partial message, and only when the details changed.
+                await self.bot.status_board.edit(f"monitor:{message_id}", channel, message_id, embed)
+            except Exception as e:
+                print(f"Error updating server info for guild {guild_id}: {e}")
 
     @update_server_info.before_loop
     async def before_update_server_info(self):
@@ -134,13 +98,13 @@ class EvrimaMonitorCog(commands.Cog):
         default_member_permissions=nextcord.Permissions(administrator=True),
         dm_permission=False
     )
-    async def postserver(self, interaction: nextcord.Interaction, channel: nextcord.TextChannel):
+    async def postserver(self, interaction: nextcord.Interaction, channel: nextcord.TextChannel, server: str = server_option()):
         await interaction.response.defer(ephemeral=True)
-        server_info = await self.get_server_info()
+        server_info = await self.get_server_info(server, priority=PRIORITY_INTERACTIVE)
         if server_info:
             embed = self.create_embed(server_info)
             message = await channel.send(embed=embed)
-            saveserverinfo(interaction.guild_id, channel.id, message.id)
+            saveserverinfo(interaction.guild_id, channel.id, message.id, self.bot.servers.get(server).name)
             await interaction.followup.send(f"Server info message created in {channel.mention}", ephemeral=True)
         else:
             await interaction.followup.send("Error retrieving server info. Check the RCON connection.", ephemeral=True)
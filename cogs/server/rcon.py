@@ -1,15 +1,17 @@
 import nextcord
 from nextcord.ext import commands
-from gamercon_async import EvrimaRCON
-from util.config import RCON_HOST, RCON_PORT, RCON_PASS
+from util.servers import server_option
+from util.bulk import run_bulk
+from util.rcon import (
+    RCON_ANNOUNCE, RCON_WIPECORPSES, RCON_UPDATEPLAYABLES,
+    RCON_BANPLAYER, RCON_KICKPLAYER, RCON_GETPLAYERLIST, RCON_SAVE, RCON_GETPLAYERDATA,
+    PRIORITY_INTERACTIVE
+)
 import logging
 
 class EvrimaRcon(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.rcon_host = RCON_HOST
-        self.rcon_password = RCON_PASS
-        self.rcon_port = RCON_PORT
 
     @nextcord.slash_command(
         description="Evrima RCON Commands",
@@ -20,65 +22,86 @@ class EvrimaRcon(commands.Cog):
         pass
 
     @rcon.subcommand(description="Save the current state of the server.")
-    async def saveserver(self, interaction: nextcord.Interaction):
+    async def saveserver(self, interaction: nextcord.Interaction, server: str = server_option()):
         await interaction.response.send_message("Saving server...", ephemeral=True)
-        command = b'\x02' + b'\x50' + b'\x00'
-        response = await self.run_rcon(command)
+        response = await self.run_rcon(server, RCON_SAVE)
         await interaction.followup.send(f"RCON response: {response}", ephemeral=True)
 
     @rcon.subcommand(description="Make an announcement on the server.")
-    async def announce(self, interaction: nextcord.Interaction, message: str):
-        command = b'\x02' + b'\x10' + message.encode() + b'\x00'
-        response = await self.run_rcon(command)
+    async def announce(self, interaction: nextcord.Interaction, message: str, server: str = server_option()):
+        response = await self.run_rcon(server, RCON_ANNOUNCE, message)
         await interaction.response.send_message(f"RCON response: {response}", ephemeral=True)
 
     # Does not seem to be working as intended.
     # Will look into this further.
     @rcon.subcommand(description="Ban a player from the server.")
-    async def banplayer(self, interaction: nextcord.Interaction, user_id: str, reason: str, ban_length: int):
+    async def banplayer(self, interaction: nextcord.Interaction, user_id: str, reason: str, ban_length: int, server: str = server_option()):
         try:
             await interaction.response.send_message(f"Banning player with User ID {user_id} for {ban_length} hours.\nReason: {reason}", ephemeral=True)
             formatted_command = f"{user_id},{reason},{ban_length}"
-            command = b'\x02' + b'\x20' + formatted_command.encode() + b'\x00'
-            response = await self.run_rcon(command)
+            response = await self.run_rcon(server, RCON_BANPLAYER, formatted_command)
             await interaction.followup.send(f"RCON response: {response}", ephemeral=True)
         except Exception as e:
             await interaction.followup.send(f"An error occurred: {e}", ephemeral=True)
 
     @rcon.subcommand(description="Kick a player from the server.")
-    async def kickplayer(self, interaction: nextcord.Interaction, user_id: str, reason: str):
+    async def kickplayer(self, interaction: nextcord.Interaction, user_id: str, reason: str, server: str = server_option()):
         await interaction.response.send_message(f"Kicking player with User ID {user_id}\nReason: {reason}", ephemeral=True)
         formatted_command = f"{user_id},{reason}"
-        command = b'\x02' + b'\x30' + formatted_command.encode() + b'\x00'
-        response = await self.run_rcon(command)
+        response = await self.run_rcon(server, RCON_KICKPLAYER, formatted_command)
         await interaction.followup.send(f"RCON response: {response}", ephemeral=True)
     
+    @rcon.subcommand(description="Kick several players at once.")
+    async def bulkkick(
+        self,
+        interaction: nextcord.Interaction,
+        reason: str,
+        user_ids: str = nextcord.SlashOption(description="User IDs separated by spaces or commas.", required=False, default=""),
+        file: nextcord.Attachment = nextcord.SlashOption(description="Text file with one User ID per line.", required=False, default=None),
+        server: str = server_option()
+    ):
+        await interaction.response.defer(ephemeral=True)
+        rcon = self.bot.servers.get(server).rcon
+        await run_bulk(interaction, rcon, "Bulk Kick", "User ID", user_ids, file, lambda user_id: (RCON_KICKPLAYER, f"{user_id},{reason}"))
+
+    @rcon.subcommand(description="Ban several players at once.")
+    async def bulkban(
+        self,
+        interaction: nextcord.Interaction,
+        reason: str,
+        ban_length: int,
+        user_ids: str = nextcord.SlashOption(description="User IDs separated by spaces or commas.", required=False, default=""),
+        file: nextcord.Attachment = nextcord.SlashOption(description="Text file with one User ID per line.", required=False, default=None),
+        server: str = server_option()
+    ):
+        await interaction.response.defer(ephemeral=True)
+        rcon = self.bot.servers.get(server).rcon
+        await run_bulk(interaction, rcon, "Bulk Ban", "User ID", user_ids, file, lambda user_id: (RCON_BANPLAYER, f"{user_id},{reason},{ban_length}"))
+
     @rcon.subcommand(description="Display a list of players on the server.")
-    async def playerlist(self, interaction: nextcord.Interaction):
+    async def playerlist(self, interaction: nextcord.Interaction, server: str = server_option()):
         try:
             await interaction.response.defer(ephemeral=True)
-            command = b'\x02' + b'\x40' + b'\x00'
-            response = await self.run_rcon(command)
+            response = await self.run_rcon(server, RCON_GETPLAYERLIST)
             await interaction.followup.send(f"RCON response: {response}", ephemeral=True)
         except Exception as e:
             await interaction.followup.send(f"An error occurred: {e}", ephemeral=True)
 
     @rcon.subcommand(description="Update list of allowed playables.")
-    async def updateplayables(self, interaction: nextcord.Interaction, message: str):
-        command = b'\x02' + b'\x15' + message.encode() + b'\x00'
-        response = await self.run_rcon(command)
+    async def updateplayables(self, interaction: nextcord.Interaction, message: str, server: str = server_option()):
+        response = await self.run_rcon(server, RCON_UPDATEPLAYABLES, message)
         await interaction.response.send_message(f"RCON response: {response}", ephemeral=True)
         
     @rcon.subcommand(description="Get details about the server.")
-    async def serverinfo(self, interaction: nextcord.Interaction):
+    async def serverinfo(self, interaction: nextcord.Interaction, server: str = server_option()):
         await interaction.response.defer(ephemeral=False)
         try:
-            # Get server info
-            command = b'\x02' + b'\x12' + b'\x00'
-            response = await self.run_rcon(command)
+            # Get server info from the shared server details cache
+            server_details = self.bot.servers.get(server).server_details
+            server_info = await server_details.get(priority=PRIORITY_INTERACTIVE)
+            response = server_details.raw
             
             # Log raw response for debugging
-            print(f"Raw server response: {response}")
             logging.info(f"Server info raw response: {response}")
             
             # Create a basic embed with the server info
@@ -88,24 +111,15 @@ class EvrimaRcon(commands.Cog):
                 color=nextcord.Color.blue()
             )
             
-            # Add the raw response to the embed in a code block
-            if response:
-                # Parse response to find server name
-                server_name = "Unknown Server"
-                if "ServerName:" in response:
-                    name_part = response.split("ServerName:", 1)[1]
-                    if "," in name_part:
-                        server_name = name_part.split(",", 1)[0].strip()
-                
+            if server_info:
                 embed.add_field(
                     name="Server Name", 
-                    value=server_name,
+                    value=server_info.name,
                     inline=False
                 )
                     
-                # Format the rest of the response
-                formatted_response = response.replace(", ", "\n• ")
-                formatted_response = "• " + formatted_response
+                # Format the rest of the details
+                formatted_response = "\n".join(f"• {key}: {value}" for key, value in server_info.fields.items())
                 
                 if len(formatted_response) > 1024:
                     # If response is too long, split it
@@ -149,23 +163,40 @@ class EvrimaRcon(commands.Cog):
                     pass
 
     @rcon.subcommand(description="Get details about a player.")
-    async def playerinfo(self, interaction: nextcord.Interaction, user_id: str):
+    async def playerinfo(self, interaction: nextcord.Interaction, user_id: str, server: str = server_option()):
         await interaction.response.defer(ephemeral=True)
-        command = b'\x02' + b'\x77' + user_id.encode() + b'\x00'
-        response = await self.run_rcon(command)
+        response = await self.run_rcon(server, RCON_GETPLAYERDATA, user_id)
         await interaction.followup.send(f"RCON response: {response}", ephemeral=True)
 
     @rcon.subcommand(description="Wipe all corpses from the server.")
-    async def wipecorpses(self, interaction: nextcord.Interaction):
-        command = b'\x02' + b'\x13' + b'\x00'
-        response = await self.run_rcon(command)
+    async def wipecorpses(self, interaction: nextcord.Interaction, server: str = server_option()):
+        response = await self.run_rcon(server, RCON_WIPECORPSES)
         await interaction.response.send_message(f"RCON response: {response}", ephemeral=True)
 
-    async def run_rcon(self, command):
+    @rcon.subcommand(description="Show RCON queue and wait time statistics.")
+    async def stats(self, interaction: nextcord.Interaction, server: str = server_option()):
+        scheduler = self.bot.servers.get(server).rcon.scheduler
+        embed = nextcord.Embed(
+            title="RCON Scheduler",
+            description=f"Active commands: {scheduler.active}/{scheduler.capacity}",
+            color=nextcord.Color.blue()
+        )
+        for name, stats in scheduler.stats().items():
+            embed.add_field(
+                name=name.capitalize(),
+                value=(
+                    f"Queued: {stats['queued']}\n"
+                    f"Sent: {stats['sent']}\n"
+                    f"Avg wait: {stats['avg_wait'] * 1000:.0f}ms\n"
+                    f"Max wait: {stats['max_wait'] * 1000:.0f}ms"
+                ),
+                inline=True
+            )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    async def run_rcon(self, server, opcode, payload=b''):
         try:
-            rcon = EvrimaRCON(self.rcon_host, self.rcon_port, self.rcon_password)
-            await rcon.connect()
-            return await rcon.send_command(command)
+            return await self.bot.servers.get(server).rcon.send(opcode, payload, priority=PRIORITY_INTERACTIVE)
         except Exception as e:
             logging.error(f"Error running RCON command: {e}")
             return None
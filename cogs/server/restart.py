@@ -1,20 +1,16 @@
 import asyncio
 import nextcord
 from nextcord.ext import commands, tasks
-from gamercon_async import EvrimaRCON
 from pydactyl import PterodactylClient
 from datetime import datetime
 import pytz
-from util.config import RCON_HOST, RCON_PORT, RCON_PASS
+from util.rcon import RCON_ANNOUNCE
 from util.config import PTERO_API, PTERO_URL
 from util.config import ENABLE_RESTART, RESTART_SERVERID, RESTART_CHANNEL
 
 class RestartServer(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.rcon_host = RCON_HOST
-        self.rcon_port = RCON_PORT
-        self.rcon_password = RCON_PASS
         self.timeout = 30
         self.ptero_client = PterodactylClient(PTERO_URL, PTERO_API)
         self.report_channel = RESTART_CHANNEL
@@ -22,10 +18,11 @@ class RestartServer(commands.Cog):
         self.restart_task.start()
 
     async def perform_restart(self, server_id, wait_time):
-        announce_command = bytes('\x02', 'utf-8') + bytes('\x10', 'utf-8') + "Server restarting in 5 minutes.".encode() + bytes('\x00', 'utf-8')
-        evrima_client = EvrimaRCON(self.rcon_host, self.rcon_port, self.rcon_password)
-        await evrima_client.connect()
-        await evrima_client.send_command(announce_command)
+        try:
+            # RESTART_SERVERID is a single Pterodactyl server, the default game server.
+            await self.bot.servers.default.rcon.send(RCON_ANNOUNCE, "Server restarting in 5 minutes.")
+        except Exception as e:
+            print(f'Error announcing restart: {e}')
 
         await asyncio.sleep(wait_time)
 
@@ -1,14 +1,11 @@
 import nextcord
 from nextcord.ext import commands
-from gamercon_async import EvrimaRCON
-from util.config import RCON_HOST, RCON_PORT, RCON_PASS
+from util.servers import server_option
+from util.rcon import RconError, PRIORITY_INTERACTIVE, RCON_TOGGLEAI, RCON_TOGGLEHUMANS, RCON_TOGGLEGLOBALCHAT
 
 class ToggleCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.rcon_host = RCON_HOST
-        self.rcon_password = RCON_PASS
-        self.rcon_port = RCON_PORT
 
     @nextcord.slash_command(
         description="Evrima Toggle Commands",
@@ -19,30 +16,28 @@ class ToggleCog(commands.Cog):
         pass
     
     @toggle.subcommand(description="Toggle AI.")
-    async def ai(self, interaction: nextcord.Interaction):
+    async def ai(self, interaction: nextcord.Interaction, server: str = server_option()):
         await interaction.response.send_message("Toggling AI on/off. Please wait for a response.", ephemeral=True)
-        command = b'\x02' + b'\x90' + b'\x00'
-        response = await self.run_rcon(command)
+        response = await self.run_rcon(server, RCON_TOGGLEAI)
         await interaction.followup.send(f"RCON response: {response}", ephemeral=True)
     
     @toggle.subcommand(description="Toggle humans.")
-    async def humans(self, interaction: nextcord.Interaction):
+    async def humans(self, interaction: nextcord.Interaction, server: str = server_option()):
         await interaction.response.send_message("Toggling humans on/off. Please wait for a response.", ephemeral=True)
-        command = b'\x02' + b'\x86' + b'\x00'
-        response = await self.run_rcon(command)
+        response = await self.run_rcon(server, RCON_TOGGLEHUMANS)
         await interaction.followup.send(f"RCON response: {response}", ephemeral=True)
 
     @toggle.subcommand(description="Toggle global chat.")
-    async def globalchat(self, interaction: nextcord.Interaction):
+    async def globalchat(self, interaction: nextcord.Interaction, server: str = server_option()):
         await interaction.response.send_message("Toggling global chat on/off. Please wait for a response.", ephemeral=True)
-        command = b'\x02' + b'\x84' + b'\x00'
-        response = await self.run_rcon(command)
+        response = await self.run_rcon(server, RCON_TOGGLEGLOBALCHAT)
         await interaction.followup.send(f"RCON response: {response}", ephemeral=True)
 
-    async def run_rcon(self, command):
-        rcon = EvrimaRCON(self.rcon_host, self.rcon_port, self.rcon_password)
-        await rcon.connect()
-        return await rcon.send_command(command)
+    async def run_rcon(self, server, opcode, payload=b''):
+        try:
+            return await self.bot.servers.get(server).rcon.send(opcode, payload, priority=PRIORITY_INTERACTIVE)
+        except RconError as e:
+            return str(e)
 
 def setup(bot):
     bot.add_cog(ToggleCog(bot))
@@ -1,14 +1,12 @@
 import nextcord
 from nextcord.ext import commands
-from gamercon_async import EvrimaRCON
-from util.config import RCON_HOST, RCON_PORT, RCON_PASS
+from util.servers import server_option
+from util.bulk import run_bulk
+from util.rcon import RconError, PRIORITY_INTERACTIVE, RCON_TOGGLEWHITELIST, RCON_ADDWHITELIST, RCON_REMOVEWHITELIST
 
 class EvrimaWhitelist(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.rcon_host = RCON_HOST
-        self.rcon_password = RCON_PASS
-        self.rcon_port = RCON_PORT
 
     @nextcord.slash_command(
         description="Evrima whitelist commands.",
@@ -19,28 +17,50 @@ class EvrimaWhitelist(commands.Cog):
         pass
 
     @whitelist.subcommand(name="add", description="Add a player to the whitelist.")
-    async def addwhitelist(self, interaction: nextcord.Interaction, eos_id: str):
-        command = b'\x02' + b'\x82' + eos_id.encode() + b'\x00'
-        response = await self.run_rcon(command)
+    async def addwhitelist(self, interaction: nextcord.Interaction, eos_id: str, server: str = server_option()):
+        response = await self.run_rcon(server, RCON_ADDWHITELIST, eos_id)
         await interaction.response.send_message(f"RCON response: {response}", ephemeral=True)
 
     @whitelist.subcommand(name="remove", description="Remove a player from the whitelist.")
-    async def removewhitelist(self, interaction: nextcord.Interaction, eos_id: str):
-        command = b'\x02' + b'\x83' + eos_id.encode() + b'\x00'
-        response = await self.run_rcon(command)
+    async def removewhitelist(self, interaction: nextcord.Interaction, eos_id: str, server: str = server_option()):
+        response = await self.run_rcon(server, RCON_REMOVEWHITELIST, eos_id)
         await interaction.response.send_message(f"RCON response: {response}", ephemeral=True)
 
+    @whitelist.subcommand(name="bulkadd", description="Add several players to the whitelist.")
+    async def bulkaddwhitelist(
+        self,
+        interaction: nextcord.Interaction,
+        eos_ids: str = nextcord.SlashOption(description="EOS IDs separated by spaces or commas.", required=False, default=""),
+        file: nextcord.Attachment = nextcord.SlashOption(description="Text file with one EOS ID per line.", required=False, default=None),
+        server: str = server_option()
+    ):
+        await interaction.response.defer(ephemeral=True)
+        rcon = self.bot.servers.get(server).rcon
+        await run_bulk(interaction, rcon, "Bulk Whitelist Add", "EOS ID", eos_ids, file, lambda eos_id: (RCON_ADDWHITELIST, eos_id))
+
+    @whitelist.subcommand(name="bulkremove", description="Remove several players from the whitelist.")
+    async def bulkremovewhitelist(
+        self,
+        interaction: nextcord.Interaction,
+        eos_ids: str = nextcord.SlashOption(description="EOS IDs separated by spaces or commas.", required=False, default=""),
+        file: nextcord.Attachment = nextcord.SlashOption(description="Text file with one EOS ID per line.", required=False, default=None),
+        server: str = server_option()
+    ):
+        await interaction.response.defer(ephemeral=True)
+        rcon = self.bot.servers.get(server).rcon
+        await run_bulk(interaction, rcon, "Bulk Whitelist Remove", "EOS ID", eos_ids, file, lambda eos_id: (RCON_REMOVEWHITELIST, eos_id))
+
     @whitelist.subcommand(name="enable", description="Enable the whitelist.")
-    async def enablewhitelist(self, interaction: nextcord.Interaction):
+    async def enablewhitelist(self, interaction: nextcord.Interaction, server: str = server_option()):
         await interaction.response.send_message("Enabling the whitelist for your server.", ephemeral=True)
-        command = b'\x02' + b'\x81' + b'\x00'
-        response = await self.run_rcon(command)
+        response = await self.run_rcon(server, RCON_TOGGLEWHITELIST)
         await interaction.followup.send(f"RCON response: {response}", ephemeral=True)
             
-    async def run_rcon(self, command):
-        rcon = EvrimaRCON(self.rcon_host, self.rcon_port, self.rcon_password)
-        await rcon.connect()
-        return await rcon.send_command(command)
+    async def run_rcon(self, server, opcode, payload=b''):
+        try:
+            return await self.bot.servers.get(server).rcon.send(opcode, payload, priority=PRIORITY_INTERACTIVE)
+        except RconError as e:
+            return str(e)
     
 def setup(bot):
     cog = EvrimaWhitelist(bot)
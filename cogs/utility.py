@@ -7,7 +7,14 @@ class Utility(commands.Cog):
 
     @nextcord.slash_command(description="Get the bot's latency.", default_member_permissions=nextcord.Permissions(administrator=True), dm_permission=False)
     async def ping(self, interaction: nextcord.Interaction):
-        await interaction.response.send_message(f"Pong! {round(self.bot.latency * 1000)}ms")
+        lag = self.bot.loop_lag.stats()
+        outbox = self.bot.outbox.stats()
+        await interaction.response.send_message(
+            f"Pong! {round(self.bot.latency * 1000)}ms\n"
+            f"Event loop lag: p50 {lag['p50'] * 1000:.0f}ms, p95 {lag['p95'] * 1000:.0f}ms, max {lag['max'] * 1000:.0f}ms\n"
+            f"Feed queue: {outbox['depth']} waiting, event to post p50 {outbox['p50']:.1f}s, p95 {outbox['p95']:.1f}s, "
+            f"{outbox['items']} events in {outbox['messages']} messages, {outbox['dropped']} dropped"
+        )
 
     @nextcord.slash_command(description="Shows list of guilds the bot is in.", default_member_permissions=nextcord.Permissions(administrator=True), dm_permission=False)
     async def guilds(self, interaction: nextcord.Interaction):
@@ -5,13 +5,32 @@ import util.config as config
 import sys
 import traceback
 import importlib.util
+from util.offsets import OffsetStore
+from util.players import PlayerRegistry
+from util.servers import ServerRegistry
+from util.looplag import LoopLagMonitor
+from util.outbox import DiscordOutbox
+from util.statusboard import StatusBoard
+from util.webhooks import WebhookPool
+
+class IsleBot(commands.Bot):
+    async def close(self):
+        # Stop reading the logs, then post what the feeds still have queued while the connection to Discord is open.
+        for server in self.servers:
+            server.log.close()
+        await self.outbox.close()
+        for server in self.servers:
+            await server.rcon.close()
+            await server.sftp.close()
+        await super().close()
 
 intents = nextcord.Intents.all()
-bot = commands.Bot(command_prefix=config.BOT_PREFIX, intents=intents, help_command=None)
+bot = IsleBot(command_prefix=config.BOT_PREFIX, intents=intents, help_command=None)
 
 @bot.event
 async def on_ready():
     print(f'We have logged in as {bot.user}')
+    bot.loop_lag.start()
 
 @bot.event
 async def on_guild_join(guild):
@@ -43,17 +62,27 @@ def has_setup_function(module_name):
     module_spec.loader.exec_module(module)
     return hasattr(module, 'setup')
 
-for entry in os.listdir("cogs"):
-    if entry.endswith('.py'):
-        module_name = f"cogs.{entry[:-3]}"
-        if has_setup_function(module_name):
-            bot.load_extension(module_name)
-    elif os.path.isdir(f"cogs/{entry}"):
-        for filename in os.listdir(f"cogs/{entry}"):
-            if filename.endswith('.py'):
-                module_name = f"cogs.{entry}.{filename[:-3]}"
-                if has_setup_function(module_name):
-                    bot.load_extension(module_name)
+def load_cogs():
+    for entry in os.listdir("cogs"):
+        if entry.endswith('.py'):
+            module_name = f"cogs.{entry[:-3]}"
+            if has_setup_function(module_name):
+                bot.load_extension(module_name)
+        elif os.path.isdir(f"cogs/{entry}"):
+            for filename in os.listdir(f"cogs/{entry}"):
+                if filename.endswith('.py'):
+                    module_name = f"cogs.{entry}.{filename[:-3]}"
+                    if has_setup_function(module_name):
+                        bot.load_extension(module_name)
 
 if __name__ == "__main__":
-    bot.run(config.BOT_TOKEN)
\ No newline at end of file
+    # Backfill worker processes import this module as well; only the bot process sets up the services and cogs.
+    bot.servers = ServerRegistry()
+    bot.players = PlayerRegistry(config.PLAYERS_DB)
+    bot.loop_lag = LoopLagMonitor(warn_threshold=config.LOOP_LAG_WARN)
+    bot.status_board = StatusBoard(OffsetStore(config.STATUS_BOARD_FILE), min_interval=config.STATUS_MIN_EDIT_INTERVAL)
+    bot.outbox = DiscordOutbox(
+        webhooks=WebhookPool(bot, config.FEED_WEBHOOKS, size=config.FEED_WEBHOOK_POOL) if config.FEED_WEBHOOKS else None
+    )
+    load_cogs()
+    bot.run(config.BOT_TOKEN)
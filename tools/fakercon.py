@@ -0,0 +1,177 @@
+"""
+Local stand-in for an Evrima RCON server.
+
+Speaks the framing used by gamercon_async.EvrimaRCON: a 0x01 login packet
+with the password, then 0x02 <opcode> <payload> 0x00 commands. Serves a
+synthetic player population and can inject latency and faults, so the bot's
+RCON behaviour can be measured without a live Isle server.
+
+    python -m tools.fakercon --players 100 --port 25575 --password secret
+"""
+import argparse
+import asyncio
+import random
+
+DINOS = [
+    'BP_Carno_C', 'BP_Cerato_C', 'BP_Dilo_C', 'BP_Herrera_C', 'BP_Omniraptor_C', 'BP_Troodon_C',
+    'BP_Deino_C', 'BP_Ptera_C', 'BP_Stego_C', 'BP_Dryo_C', 'BP_Teno_C', 'BP_Hypsi_C',
+    'BP_Pachy_C', 'BP_Maia_C', 'BP_Diablo_C', 'BP_Galli_C', 'BP_Beipi_C'
+]
+
+class FakePlayer:
+    def __init__(self, index, rng):
+        self.steam_id = str(76561198000000000 + index)
+        self.name = f"Player{index}"
+        self.dino = rng.choice(DINOS)
+        self.growth = round(rng.random(), 2)
+        self.location = f"X={rng.uniform(-400000, 400000):.3f} Y={rng.uniform(-400000, 400000):.3f} Z={rng.uniform(0, 20000):.3f}"
+
+    def data(self):
+        return (
+            f"PlayerDataName: {self.name}, PlayerID: {self.steam_id}, Location: {self.location}, "
+            f"Class: {self.dino}, Growth: {self.growth}, Health: 1.0, Stamina: 1.0, Hunger: 0.8, Thirst: 0.9\n"
+        )
+
+class FakeEvrimaServer:
+    """
+    Fake RCON endpoint.
+
+    latency/jitter are seconds added before every reply. drop_rate and
+    stall_rate are the chances that a command closes the connection or never
+    gets a reply. With bulk_player_data off, 0x77 without an ID is refused
+    the way older servers do, forcing clients onto per-player requests.
+    """
+
+    def __init__(self, players=10, password="password", latency=0.0, jitter=0.0,
+                 drop_rate=0.0, stall_rate=0.0, bulk_player_data=True, seed=None):
+        self.password = password
+        self.latency = latency
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.stall_rate = stall_rate
+        self.bulk_player_data = bulk_player_data
+        self.rng = random.Random(seed)
+        self.players = {}
+        self.set_population(players)
+        self.connections = 0
+        self.logins = 0
+        self.commands = {}
+        self.server = None
+
+    def set_population(self, count):
+        self.players = {}
+        for index in range(count):
+            player = FakePlayer(index, self.rng)
+            self.players[player.steam_id] = player
+
+    @property
+    def port(self):
+        return self.server.sockets[0].getsockname()[1]
+
+    async def start(self, host="127.0.0.1", port=0):
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            login = await reader.read(1024)
+            if not login.startswith(b'\x01') or login[1:].rstrip(b'\x00').decode(errors='replace') != self.password:
+                writer.write(b'Password Denied')
+                await writer.drain()
+                return
+            self.logins += 1
+            writer.write(b'Password Accepted')
+            await writer.drain()
+
+            buffer = b''
+            while True:
+                data = await reader.read(4096)
+                if not data:
+                    return
+                buffer += data
+                while b'\x02' in buffer:
+                    start = buffer.index(b'\x02')
+                    end = buffer.find(b'\x00', start + 2)
+                    if end == -1:
+                        break
+                    frame, buffer = buffer[start:end], buffer[end + 1:]
+                    if not await self.reply(writer, frame[1], frame[2:].decode(errors='replace')):
+                        return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def reply(self, writer, opcode, payload):
+        self.commands[opcode] = self.commands.get(opcode, 0) + 1
+        delay = self.latency + self.rng.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        roll = self.rng.random()
+        if roll < self.drop_rate:
+            return False
+        if roll < self.drop_rate + self.stall_rate:
+            return True
+        writer.write(self.respond(opcode, payload).encode())
+        await writer.drain()
+        return True
+
+    def respond(self, opcode, payload):
+        if opcode == 0x12:
+            return (
+                f"ServerDetailsServerName: Fake Evrima Server, ServerPassword: , ServerMap: Gateway, "
+                f"ServerMaxPlayers: 500, ServerCurrentPlayers: {len(self.players)}, bEnableMutations: true, "
+                f"bEnableHumans: false, bServerPassword: false, bQueueEnabled: true, bServerWhitelist: false, "
+                f"bSpawnAI: true, bAllowRecordingReplay: false, bUseRegionSpawning: true, "
+                f"bUseRegionSpawnCooldown: true, RegionSpawnCooldownTimeSeconds: 30, "
+                f"ServerDayLengthMinutes: 45, ServerNightLengthMinutes: 20, bEnableGlobalChat: true\n"
+            )
+        if opcode == 0x40:
+            return "PlayerList\n" + "".join(f"{p.steam_id},\n{p.name},\n" for p in self.players.values())
+        if opcode == 0x77:
+            if not payload:
+                if not self.bulk_player_data:
+                    return "No player specified\n"
+                return "".join(p.data() for p in self.players.values())
+            player = self.players.get(payload) or next((p for p in self.players.values() if p.name == payload), None)
+            return player.data() if player else f"Player {payload} not found\n"
+        if opcode in (0x20, 0x30):
+            target = payload.split(",", 1)[0]
+            removed = self.players.pop(target, None)
+            action = "Banned" if opcode == 0x20 else "Kicked"
+            return f"{action} {target}\n" if removed else f"Player {target} not found\n"
+        if opcode == 0x10:
+            return f"Announced: {payload}\n"
+        if opcode == 0x11:
+            return f"Message sent: {payload}\n"
+        return f"Command 0x{opcode:02x} executed\n"
+
+async def main():
+    parser = argparse.ArgumentParser(description="Run a fake Evrima RCON server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=25575)
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--players", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added before every reply")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random extra seconds added before every reply")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="chance a command closes the connection")
+    parser.add_argument("--stall-rate", type=float, default=0.0, help="chance a command never gets a reply")
+    parser.add_argument("--no-bulk", action="store_true", help="refuse 0x77 without a player ID")
+    args = parser.parse_args()
+
+    server = FakeEvrimaServer(
+        players=args.players, password=args.password, latency=args.latency, jitter=args.jitter,
+        drop_rate=args.drop_rate, stall_rate=args.stall_rate, bulk_player_data=not args.no_bulk
+    )
+    await server.start(args.host, args.port)
+    print(f"Fake Evrima RCON server with {args.players} players listening on {args.host}:{server.port}")
+    await server.server.serve_forever()
+
+if __name__ == "__main__":
+    asyncio.run(main())
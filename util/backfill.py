@@ -0,0 +1,193 @@
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+import posixpath
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from util.logevents import ChatEvent, ConnectEvent, JoinEvent, KillEvent, parse_log_line
+from util.players import PlayerPairing
+from util.sftp import SftpPool
+
+# Players written to the registry between returns to the event loop, so the live feeds keep running.
+STORE_BATCH = 500
+
+def backup_names(file_path, names):
+    """The rotated copies of `file_path` among `names`, oldest first (e.g. TheIsle-Shipping-backup-2024.10.15-12.00.00.log)."""
+    stem, extension = posixpath.splitext(posixpath.basename(file_path))
+    prefix = f"{stem}-backup-"
+    return sorted(name for name in names if name.startswith(prefix) and name.endswith(extension))
+
+def line_key(line):
+    """The key an event is stored under: a hash of its log line, which starts with a millisecond timestamp."""
+    return hashlib.blake2b(line.rstrip("\r\n").encode(), digest_size=16).digest()
+
+def line_timestamp(line):
+    return line[1:line.find("]")] if line.startswith("[") else ""
+
+def parse_backup(path):
+    """
+    Parse one downloaded log; runs in a worker process.
+
+    Sends back the players found in the file, its kills and chat messages
+    as rows for EventHistory, and how many events of each type it held.
+    """
+    pairing = PlayerPairing()
+    players = {}
+    kills = []
+    chat = []
+    counts = {}
+    lines = 0
+    with open(path, "r", encoding="utf-8", errors="replace") as file:
+        for line in file:
+            lines += 1
+            event = parse_log_line(line)
+            if event is None:
+                continue
+            name = type(event).__name__
+            counts[name] = counts.get(name, 0) + 1
+            if isinstance(event, (ConnectEvent, JoinEvent)):
+                player = pairing.add(event)
+                if player is not None:
+                    players.setdefault((player[1], player[2]), player)
+            elif isinstance(event, KillEvent):
+                kills.append((
+                    line_key(line), event.timestamp, event.killer, event.killer_id, event.killer_dino,
+                    event.gender, event.natural, event.victim, event.victim_id, event.victim_dino
+                ))
+            elif isinstance(event, ChatEvent):
+                chat.append((
+                    line_key(line), line_timestamp(line), event.channel, event.group,
+                    event.player, event.steam_id, event.message
+                ))
+    return {"lines": lines, "counts": counts, "players": list(players.values()), "kills": kills, "chat": chat}
+
+class Backfill:
+    """
+    Imports the rotated logs of one server into the player registry and the event history.
+
+    The backups are listed and downloaded over a separate SFTP pool of
+    `concurrency` sessions, so the live log tailer keeps its own sessions.
+    Files are parsed in a process pool of `workers` processes. Every
+    finished file is recorded in `state` with its size and modification
+    time, so an interrupted run picks up where it stopped and a second run
+    only reads new backups. Players are deduplicated by the registry,
+    kills and chat messages by `history`. Nothing is posted to Discord.
+    """
+
+    def __init__(self, server, registry, history, state, concurrency=4, workers=None, timeout=10, download_dir=os.path.join("data", "backfill")):
+        self.server = server
+        self.registry = registry
+        self.history = history
+        self.state = state
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.workers = workers
+        self.download_dir = os.path.join(download_dir, server.name)
+        self.stats = {"files": 0, "skipped": 0, "failed": 0, "bytes": 0, "lines": 0, "players": 0, "kills": 0, "chat": 0, "counts": {}}
+        self.started = None
+        # One file's events are written at a time, so each commit covers only that file.
+        self.store_lock = asyncio.Lock()
+
+    async def run(self):
+        self.started = time.perf_counter()
+        pool = SftpPool(
+            self.server.ftp_host,
+            self.server.ftp_port,
+            self.server.ftp_username,
+            self.server.ftp_password,
+            size=self.concurrency,
+            keepalive=0,
+            timeout=self.timeout
+        )
+        os.makedirs(self.download_dir, exist_ok=True)
+        try:
+            backups = await pool.run(self.list_backups, self.server.file_path)
+            done = dict(self.state.get(self.server.name) or {})
+            todo = []
+            for name, size, mtime in backups:
+                if done.get(name) == [size, mtime]:
+                    self.stats["skipped"] += 1
+                else:
+                    todo.append((name, size, mtime))
+            # Forking the bot would copy its SFTP threads and event loop into the
+            # workers mid-use, so they are started fresh instead.
+            processes = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+            try:
+                await asyncio.gather(*(self.import_file(pool, processes, done, *entry) for entry in todo))
+            finally:
+                # Waiting for the workers to exit would otherwise block the event loop.
+                await asyncio.to_thread(processes.shutdown)
+        finally:
+            await pool.close()
+            shutil.rmtree(self.download_dir, ignore_errors=True)
+        return self.report()
+
+    def list_backups(self, sftp, file_path):
+        directory = posixpath.dirname(file_path) or "."
+        attributes = {entry.filename: entry for entry in sftp.listdir_attr(directory)}
+        return [
+            (name, attributes[name].st_size, attributes[name].st_mtime)
+            for name in backup_names(file_path, attributes)
+        ]
+
+    def download(self, sftp, remote_path, local_path):
+        # SFTPClient.get prefetches, keeping many read requests in flight.
+        sftp.get(remote_path, local_path)
+
+    async def import_file(self, pool, processes, done, name, size, mtime):
+        remote_path = posixpath.join(posixpath.dirname(self.server.file_path), name)
+        local_path = os.path.join(self.download_dir, name)
+        try:
+            await pool.run(self.download, remote_path, local_path)
+            result = await asyncio.get_event_loop().run_in_executor(processes, parse_backup, local_path)
+        except Exception as e:
+            self.stats["failed"] += 1
+            logging.error(f"Backfill of {name} from {self.server.name} failed: {e}")
+            return
+        finally:
+            if os.path.exists(local_path):
+                os.remove(local_path)
+        # Everything is saved before the file is marked done, so a crash in between only re-reads it.
+        self.stats["players"] += await self.store_players(result["players"])
+        async with self.store_lock:
+            kills, chat = await asyncio.to_thread(self.store_events, result["kills"], result["chat"])
+        self.stats["kills"] += kills
+        self.stats["chat"] += chat
+        done[name] = [size, mtime]
+        self.state.set(self.server.name, dict(done))
+        self.stats["files"] += 1
+        self.stats["bytes"] += size
+        self.stats["lines"] += result["lines"]
+        for event_type, count in result["counts"].items():
+            self.stats["counts"][event_type] = self.stats["counts"].get(event_type, 0) + count
+
+    async def store_players(self, players):
+        # The registry's search index is used by the event loop, so players are added there in small batches.
+        added = 0
+        for first in range(0, len(players), STORE_BATCH):
+            added += self.registry.upsert_many(players[first:first + STORE_BATCH])
+            await asyncio.sleep(0)
+        self.registry.save()
+        return added
+
+    def store_events(self, kills, chat):
+        """Store and commit a file's kills and chat; runs in a thread."""
+        added = self.history.add_kills(self.server.name, kills), self.history.add_chat(self.server.name, chat)
+        self.history.save()
+        return added
+
+    def report(self):
+        elapsed = max(time.perf_counter() - self.started, 1e-6)
+        stats = self.stats
+        events = ", ".join(f"{count} {name}" for name, count in sorted(stats["counts"].items())) or "no events"
+        return (
+            f"Backfilled {stats['files']} logs from {self.server.name} "
+            f"({stats['skipped']} already done, {stats['failed']} failed): "
+            f"{stats['bytes'] / 1024 / 1024:.1f} MB, {stats['lines']} lines in {elapsed:.1f}s "
+            f"({stats['bytes'] / 1024 / 1024 / elapsed:.1f} MB/s, {stats['lines'] / elapsed:,.0f} lines/s). "
+            f"{events}; {stats['players']} new players, {stats['kills']} new kills "
+            f"and {stats['chat']} new chat messages stored."
+        )
@@ -0,0 +1,94 @@
+import re
+import nextcord
+from util.rcon import RconError, PRIORITY_INTERACTIVE
+
+ID_SEPARATOR = re.compile(r"[\s,;]+")
+MAX_FILE_SIZE = 1024 * 1024
+RESULTS_PER_PAGE = 20
+
+async def collect_ids(text=None, attachment=None):
+    """IDs from a separated list and/or an attached text file, in order and without duplicates."""
+    raw = text or ""
+    if attachment is not None:
+        if attachment.size > MAX_FILE_SIZE:
+            raise ValueError(f"{attachment.filename} is larger than {MAX_FILE_SIZE // 1024} KB.")
+        raw += "\n" + (await attachment.read()).decode(errors="replace")
+    ids = []
+    seen = set()
+    for value in ID_SEPARATOR.split(raw):
+        if value and value not in seen:
+            seen.add(value)
+            ids.append(value)
+    return ids
+
+def result_pages(title, ids, results, per_page=RESULTS_PER_PAGE):
+    """One embed page per `per_page` IDs, listing each ID with its RCON response or error."""
+    lines = []
+    failed = 0
+    for target, (response, error) in zip(ids, results):
+        if error is not None:
+            failed += 1
+            lines.append(f"❌ `{target}`: {error}")
+        else:
+            lines.append(f"✅ `{target}`: {(response or '').strip()[:80] or 'OK'}")
+    summary = f"{len(ids) - failed} succeeded, {failed} failed"
+    pages = []
+    page_count = max(1, -(-len(lines) // per_page))
+    for page in range(page_count):
+        embed = nextcord.Embed(
+            title=title,
+            description="\n".join(lines[page * per_page:(page + 1) * per_page])[:4096],
+            color=nextcord.Color.green() if not failed else nextcord.Color.orange()
+        )
+        embed.set_footer(text=f"{summary} • Page {page + 1}/{page_count}")
+        pages.append(embed)
+    return pages
+
+class EmbedPaginator(nextcord.ui.View):
+    def __init__(self, pages, timeout=600):
+        super().__init__(timeout=timeout)
+        self.pages = pages
+        self.index = 0
+        self.update_buttons()
+
+    def update_buttons(self):
+        self.previous_page.disabled = self.index == 0
+        self.next_page.disabled = self.index >= len(self.pages) - 1
+
+    async def show(self, interaction):
+        self.update_buttons()
+        await interaction.response.edit_message(embed=self.pages[self.index], view=self)
+
+    @nextcord.ui.button(label="Previous", style=nextcord.ButtonStyle.secondary)
+    async def previous_page(self, _button: nextcord.ui.Button, interaction: nextcord.Interaction):
+        self.index = max(0, self.index - 1)
+        await self.show(interaction)
+
+    @nextcord.ui.button(label="Next", style=nextcord.ButtonStyle.secondary)
+    async def next_page(self, _button: nextcord.ui.Button, interaction: nextcord.Interaction):
+        self.index = min(len(self.pages) - 1, self.index + 1)
+        await self.show(interaction)
+
+async def send_results(interaction, title, ids, results):
+    pages = result_pages(title, ids, results)
+    if len(pages) > 1:
+        await interaction.followup.send(embed=pages[0], view=EmbedPaginator(pages), ephemeral=True)
+    else:
+        await interaction.followup.send(embed=pages[0], ephemeral=True)
+
+async def run_bulk(interaction, rcon, title, id_name, text, attachment, command):
+    """Run `command(id)` (an opcode and payload) for every ID given, as one RCON batch, and reply with the results."""
+    try:
+        ids = await collect_ids(text, attachment)
+    except ValueError as e:
+        await interaction.followup.send(str(e), ephemeral=True)
+        return
+    if not ids:
+        await interaction.followup.send(f"No {id_name}s given.", ephemeral=True)
+        return
+    try:
+        results = await rcon.send_batch([command(target) for target in ids], priority=PRIORITY_INTERACTIVE)
+    except RconError as e:
+        await interaction.followup.send(f"An error occurred: {e}", ephemeral=True)
+        return
+    await send_results(interaction, title, ids, results)
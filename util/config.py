@@ -5,9 +5,31 @@ load_dotenv()
 
 BOT_TOKEN = os.getenv("BOT_TOKEN", "default_bot_token")
 BOT_PREFIX = os.getenv("BOT_PREFIX", "!")
+
+# Multi-server configuration, see README. Without it the single server below is used.
+SERVER_NAME = os.getenv("SERVER_NAME", "default")
+SERVERS_FILE = os.getenv("SERVERS_FILE", "data/servers.json")
+
 RCON_HOST = os.getenv("RCON_HOST", "localhost")
 RCON_PORT = int(os.getenv("RCON_PORT", 25575))
 RCON_PASS = os.getenv("RCON_PASS", "default_rcon_password")
+RCON_POOL_SIZE = int(os.getenv("RCON_POOL_SIZE", 2))
+RCON_KEEPALIVE = int(os.getenv("RCON_KEEPALIVE", 60))
+RCON_TIMEOUT = int(os.getenv("RCON_TIMEOUT", 10))
+RCON_RATE = float(os.getenv("RCON_RATE", 20))
+RCON_OPCODE_LIMITS = {
+    int(opcode, 16): int(limit)
+    for opcode, limit in (item.split(":") for item in os.getenv("RCON_OPCODE_LIMITS", "0x77:1").split(",") if ":" in item)
+}
+SERVERINFO_TTL = int(os.getenv("SERVERINFO_TTL", 15))
+
+# Circuit breaker for the RCON and SFTP endpoints
+HEALTH_FAILURE_THRESHOLD = int(os.getenv("HEALTH_FAILURE_THRESHOLD", 3))
+HEALTH_BACKOFF_BASE = int(os.getenv("HEALTH_BACKOFF_BASE", 5))
+HEALTH_BACKOFF_MAX = int(os.getenv("HEALTH_BACKOFF_MAX", 300))
+
+# Warn when blocking work holds up the event loop
+LOOP_LAG_WARN = float(os.getenv("LOOP_LAG_WARN", 1.0))
 
 CHATLOG_CHANNEL = int(os.getenv("CHATLOG_CHANNEL", 0))
 SPATIALCHAT_CHANNEL = int(os.getenv('SPATIALCHAT_CHANNEL', 0))
@@ -20,6 +42,21 @@ FTP_PORT = int(os.getenv("FTP_PORT", 21))
 FTP_USER = os.getenv("FTP_USER", "user")
 FTP_PASS = os.getenv("FTP_PASS", "password")
 FILE_PATH = os.getenv("FILE_PATH", "/TheIsle/Saved/Logs/TheIsle-Shipping.log")
+LOG_POLL_INTERVAL = float(os.getenv("LOG_POLL_INTERVAL", 5))
+LOG_POLL_MIN = float(os.getenv("LOG_POLL_MIN", 1))
+LOG_POLL_MAX = float(os.getenv("LOG_POLL_MAX", 30))
+LOCAL_LOG_PATH = os.getenv("LOCAL_LOG_PATH", "")
+LOG_OFFSETS_FILE = os.getenv("LOG_OFFSETS_FILE", "data/logoffsets.json")
+PLAYERS_DB = os.getenv("PLAYERS_DB", "data/players.db")
+SFTP_POOL_SIZE = int(os.getenv("SFTP_POOL_SIZE", 2))
+SFTP_KEEPALIVE = int(os.getenv("SFTP_KEEPALIVE", 30))
+SFTP_TIMEOUT = int(os.getenv("SFTP_TIMEOUT", 10))
+FEED_WEBHOOKS = [feed.strip() for feed in os.getenv("FEED_WEBHOOKS", "").split(",") if feed.strip()]
+FEED_WEBHOOK_POOL = int(os.getenv("FEED_WEBHOOK_POOL", 2))
+BACKFILL_STATE_FILE = os.getenv("BACKFILL_STATE_FILE", "data/backfill.json")
+BACKFILL_CONCURRENCY = int(os.getenv("BACKFILL_CONCURRENCY", 4))
+BACKFILL_WORKERS = int(os.getenv("BACKFILL_WORKERS", 0)) or None
+HISTORY_DB = os.getenv("HISTORY_DB", "data/history.db")
 ADMIN_FILE_PATH = os.getenv("ADMIN_FILE_PATH", "/TheIsle/Saved/Config/LinuxServer/Game.ini")
 ENABLE_INJECTIONS = os.getenv('ENABLE_INJECTIONS', 'false').lower() in ['true', '1', 'yes']
 
@@ -32,8 +69,15 @@ ENABLE_RESTART = os.getenv('ENABLE_RESTART', 'false').lower() in ['true', '1', '
 RESTART_SERVERID = int(os.getenv("RESTART_SERVERID", 0))
 RESTART_CHANNEL = int(os.getenv("RESTART_CHANNEL", 0))
 
+# Status messages of the DinoTracker and server monitor
+STATUS_BOARD_FILE = os.getenv("STATUS_BOARD_FILE", "data/statusboard.json")
+STATUS_MIN_EDIT_INTERVAL = float(os.getenv("STATUS_MIN_EDIT_INTERVAL", 30))
+MONITOR_EDIT_CONCURRENCY = int(os.getenv("MONITOR_EDIT_CONCURRENCY", 5))
+
 # DinoTracker Configuration
 ENABLE_DINO_TRACKER = os.getenv('ENABLE_DINO_TRACKER', 'false').lower() in ['true', '1', 'yes']
 DINOTRACKER_CHANNEL = int(os.getenv("DINOTRACKER_CHANNEL", 0))
+SNAPSHOT_DEADLINE = int(os.getenv("SNAPSHOT_DEADLINE", 45))
+SNAPSHOT_CONCURRENCY = int(os.getenv("SNAPSHOT_CONCURRENCY", 0))
 # ChatCommands Configuration
 ENABLE_CHAT_COMMANDS = os.getenv('ENABLE_CHAT_COMMANDS', 'false').lower() in ['true', '1', 'yes']
\ No newline at end of file
@@ -0,0 +1,99 @@
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+# struct inotify_event: int wd; uint32_t mask, cookie, len; char name[len];
+EVENT_HEADER = struct.Struct("iIII")
+# Writes landing this close together are picked up by one read.
+COALESCE_DELAY = 0.1
+
+def _load_libc():
+    name = ctypes.util.find_library("c")
+    try:
+        libc = ctypes.CDLL(name, use_errno=True)
+        libc.inotify_init1
+    except (OSError, AttributeError, TypeError):
+        return None
+    return libc
+
+_libc = _load_libc()
+
+class FileWatcher:
+    """
+    Wakes up when a local file is written to, using Linux inotify.
+
+    The file's directory is watched rather than the file itself, so a log
+    that is rotated, deleted or recreated keeps waking the watcher. Where
+    inotify is not available `wait` simply sleeps for its timeout, which
+    falls back to plain polling.
+    """
+
+    def __init__(self, path):
+        self.directory, self.filename = os.path.split(os.path.abspath(path))
+        self.fd = None
+        self._changed = None
+
+    @property
+    def active(self):
+        return self.fd is not None
+
+    def start(self):
+        if self.fd is not None:
+            return True
+        self._changed = asyncio.Event()
+        if _libc is None:
+            logging.warning(f"inotify is not available, polling {self.filename} instead.")
+            return False
+        fd = _libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            logging.warning(f"Could not start inotify ({os.strerror(ctypes.get_errno())}), polling {self.filename} instead.")
+            return False
+        if _libc.inotify_add_watch(fd, os.fsencode(self.directory), WATCH_MASK) < 0:
+            logging.warning(f"Could not watch {self.directory} ({os.strerror(ctypes.get_errno())}), polling {self.filename} instead.")
+            os.close(fd)
+            return False
+        self.fd = fd
+        asyncio.get_event_loop().add_reader(fd, self._on_readable)
+        return True
+
+    def _on_readable(self):
+        try:
+            buffer = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(buffer):
+            _, mask, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+            start = offset + EVENT_HEADER.size
+            name = buffer[start:start + length].rstrip(b"\0")
+            offset = start + length
+            # On overflow the kernel dropped events, so assume ours was among them.
+            if mask & IN_Q_OVERFLOW or name == os.fsencode(self.filename):
+                self._changed.set()
+
+    async def wait(self, timeout):
+        """Return once the file changed, or after `timeout` seconds at the latest."""
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return
+        await asyncio.sleep(COALESCE_DELAY)
+        self._changed.clear()
+
+    def close(self):
+        if self.fd is not None:
+            asyncio.get_event_loop().remove_reader(self.fd)
+            os.close(self.fd)
+            self.fd = None
@@ -1,7 +1,7 @@
 import os
 import json
         
-def saveserverinfo(guild_id, channel_id, message_id):
+def saveserverinfo(guild_id, channel_id, message_id, server=None):
     directory = 'data'
     filepath = os.path.join(directory, 'monitor.json')
     if not os.path.exists(directory):
@@ -12,19 +12,15 @@ def saveserverinfo(guild_id, channel_id, message_id):
     except FileNotFoundError:
         data = {}
     guild_data = data.get(str(guild_id), [])
-    guild_data.append({'channel_id': channel_id, 'message_id': message_id})
+    guild_data.append({'channel_id': channel_id, 'message_id': message_id, 'server': server})
     data[str(guild_id)] = guild_data
     with open(filepath, 'w') as f:
         json.dump(data, f, indent=4)
 
-def loadserverinfo(guild_id):
-    directory = 'data'
-    filepath = os.path.join(directory, 'monitor.json')
-    if not os.path.exists(directory):
-        os.makedirs(directory)
+def loadallserverinfo():
+    filepath = os.path.join('data', 'monitor.json')
     try:
         with open(filepath, 'r') as f:
-            data = json.load(f)
-            return data.get(str(guild_id))
+            return json.load(f)
     except FileNotFoundError:
-        return None
\ No newline at end of file
+        return {}
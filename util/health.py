@@ -0,0 +1,84 @@
+import logging
+import random
+import time
+
+class EndpointUnavailable(Exception):
+    pass
+
+class EndpointHealth:
+    """
+    Circuit breaker shared by everything talking to one endpoint (RCON, SFTP).
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    callers are turned away without touching the network. Once the backoff
+    delay has passed, a single caller is let through as a probe. If the probe
+    succeeds the circuit closes and every loop resumes on its next tick; if it
+    fails the next delay doubles, up to `max_delay`, with random jitter so a
+    restarting server is not hit by every caller at the same instant.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, name, failure_threshold=3, base_delay=5, max_delay=300, probe_timeout=60):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.probe_timeout = probe_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.retry_at = 0.0
+        self.last_error = None
+        self._probe_started = 0.0
+
+    @property
+    def available(self):
+        """True if a call would currently be let through (without claiming the probe)."""
+        now = time.monotonic()
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            return now >= self.retry_at
+        return now >= self._probe_started + self.probe_timeout
+
+    @property
+    def retry_in(self):
+        return max(0.0, self.retry_at - time.monotonic())
+
+    def allow(self):
+        if not self.available:
+            return False
+        if self.state != self.CLOSED:
+            self.state = self.HALF_OPEN
+            self._probe_started = time.monotonic()
+            logging.info(f"{self.name} circuit half-open, probing endpoint.")
+        return True
+
+    def check(self):
+        if not self.allow():
+            raise EndpointUnavailable(f"{self.name} unavailable, retrying in {self.retry_in:.0f}s")
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            logging.info(f"{self.name} is reachable again, resuming.")
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0
+
+    def record_failure(self, error=None):
+        self.failures += 1
+        self.last_error = error
+        if self.state == self.OPEN:
+            # Requests that started before the circuit opened.
+            return
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.trips += 1
+            delay = min(self.max_delay, self.base_delay * 2 ** (self.trips - 1))
+            delay = random.uniform(delay / 2, delay)
+            if self.state == self.CLOSED:
+                logging.warning(f"{self.name} failed {self.failures} times in a row ({error}), backing off.")
+            self.state = self.OPEN
+            self.retry_at = time.monotonic() + delay
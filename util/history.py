@@ -0,0 +1,78 @@
+import os
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS kills (
+    server TEXT NOT NULL,
+    line_key BLOB NOT NULL,
+    timestamp TEXT NOT NULL,
+    killer TEXT NOT NULL,
+    killer_id TEXT NOT NULL,
+    killer_dino TEXT NOT NULL,
+    gender TEXT NOT NULL,
+    natural INTEGER NOT NULL,
+    victim TEXT NOT NULL,
+    victim_id TEXT NOT NULL,
+    victim_dino TEXT NOT NULL,
+    PRIMARY KEY (server, line_key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS kills_killer_id ON kills (killer_id);
+CREATE INDEX IF NOT EXISTS kills_victim_id ON kills (victim_id);
+CREATE TABLE IF NOT EXISTS chat (
+    server TEXT NOT NULL,
+    line_key BLOB NOT NULL,
+    timestamp TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    chat_group TEXT NOT NULL,
+    player TEXT NOT NULL,
+    steam_id TEXT NOT NULL,
+    message TEXT NOT NULL,
+    PRIMARY KEY (server, line_key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS chat_steam_id ON chat (steam_id);
+"""
+
+class EventHistory:
+    """
+    Kills and chat messages imported from old logs, in an SQLite database (data/history.db).
+
+    Each row is keyed by its server and a hash of the log line it came
+    from. Log lines carry a millisecond timestamp, so the same event read
+    twice (from overlapping backups or a repeated import) is stored once.
+    Like the player registry, adding rows opens a transaction that `save`
+    commits. The backfill writes to it from a worker thread.
+    """
+
+    def __init__(self, path=os.path.join("data", "history.db")):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # The backfill writes from a worker thread, one import at a time.
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def _add(self, sql, server, rows):
+        before = self.db.total_changes
+        self.db.executemany(sql, ((server, *row) for row in rows))
+        return self.db.total_changes - before
+
+    def add_kills(self, server, rows):
+        """Store (line_key, timestamp, killer, killer_id, killer_dino, gender, natural, victim, victim_id, victim_dino) rows; returns how many were new."""
+        return self._add("INSERT OR IGNORE INTO kills VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", server, rows)
+
+    def add_chat(self, server, rows):
+        """Store (line_key, timestamp, channel, group, player, steam_id, message) rows; returns how many were new."""
+        return self._add("INSERT OR IGNORE INTO chat VALUES (?, ?, ?, ?, ?, ?, ?, ?)", server, rows)
+
+    def save(self):
+        if not self.db.in_transaction:
+            return False
+        self.db.commit()
+        return True
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
@@ -0,0 +1,111 @@
+import re
+from dataclasses import dataclass
+
+@dataclass
+class ChatEvent:
+    __slots__ = ("channel", "group", "player", "steam_id", "message")
+    channel: str
+    group: str
+    player: str
+    steam_id: str
+    message: str
+
+@dataclass
+class KillEvent:
+    __slots__ = ("timestamp", "killer", "killer_id", "killer_dino", "gender", "natural", "victim", "victim_id", "victim_dino")
+    timestamp: str
+    killer: str
+    killer_id: str
+    killer_dino: str
+    gender: str
+    natural: bool
+    victim: str
+    victim_id: str
+    victim_dino: str
+
+@dataclass
+class AdminCommandEvent:
+    __slots__ = ("admin", "steam_id", "command", "target", "target_id", "target_class", "target_gender", "previous_value", "new_value")
+    admin: str
+    steam_id: str
+    command: str
+    target: str
+    target_id: str
+    target_class: str
+    target_gender: str
+    previous_value: str
+    new_value: str
+
+@dataclass
+class JoinEvent:
+    __slots__ = ("name", "steam_id")
+    name: str
+    steam_id: str
+
+@dataclass
+class ConnectEvent:
+    __slots__ = ("steam_id", "eos_id")
+    steam_id: str
+    eos_id: str
+
+CHAT_PATTERN = re.compile(r"\[LogTheIsleChatData\]: \[(.*?)\] \[(.*?)\] (.*?) \[(\d+)\]: (.*)")
+KILL_PATTERN = re.compile(r"\[([\d\.\-]+)\]\[LogTheIsleKillData\]: (.*?) \[(\d+)\] Dino: (.*?), (Male|Female), \d+\.\d+ - (Died from Natural cause|Killed the following player: (.*?), \[(\d+)\], Dino: (.*?),)")
+ADMIN_PATTERN = re.compile(r"\[LogTheIsleCommandData\]: (.*?) \[(\d+)\] used command: (.*?)(?: at: (.*?), \[(\d+)\], Class: (.*?), Gender: (.*?), Previous value: (.*?), New value: (.*?)%)?$")
+JOIN_PATTERN = re.compile(r"\[LogTheIsleJoinData\]: (\w+) \[(\d+)\] Joined The Server")
+CONNECT_PATTERN = re.compile(r"\[LogTheIsleServer\]: \[Player Connecting .. Steam_Id: (\d+)\s*,\s*EOS_Id: (\w+)\]")
+
+def _chat(match):
+    return ChatEvent(*match.groups())
+
+def _kill(match):
+    timestamp, killer, killer_id, killer_dino, gender, event_type, victim, victim_id, victim_dino = match.groups()
+    return KillEvent(
+        timestamp, killer, killer_id, killer_dino, gender,
+        "Died from Natural cause" in event_type,
+        victim or "", victim_id or "", victim_dino or ""
+    )
+
+def _admin(match):
+    return AdminCommandEvent(*(value or "" for value in match.groups()))
+
+def _join(match):
+    return JoinEvent(*match.groups())
+
+def _connect(match):
+    return ConnectEvent(*match.groups())
+
+TAG_PREFIX = "[LogTheIsle"
+
+# Category tag -> (substring the line must also contain, pattern, builder).
+# Only the pattern for the line's own tag ever runs.
+LINE_TYPES = {
+    "LogTheIsleChatData": (None, CHAT_PATTERN, _chat),
+    "LogTheIsleKillData": (None, KILL_PATTERN, _kill),
+    "LogTheIsleCommandData": (None, ADMIN_PATTERN, _admin),
+    "LogTheIsleJoinData": (None, JOIN_PATTERN, _join),
+    "LogTheIsleServer": ("Player Connecting", CONNECT_PATTERN, _connect),
+}
+
+def parse_log_line(line):
+    """Turn one line of TheIsle-Shipping.log into an event, or None if nobody cares about it."""
+    start = line.find(TAG_PREFIX)
+    if start < 0:
+        return None
+    end = line.find("]", start)
+    line_type = LINE_TYPES.get(line[start + 1:end])
+    if line_type is None:
+        return None
+    required, pattern, build = line_type
+    if required is not None and required not in line:
+        return None
+    match = pattern.search(line)
+    return build(match) if match else None
+
+def parse_log_lines(text):
+    """Parse a block of log text, yielding its events in order."""
+    if TAG_PREFIX not in text:
+        return
+    for line in text.splitlines():
+        event = parse_log_line(line)
+        if event is not None:
+            yield event
@@ -0,0 +1,274 @@
+import asyncio
+import logging
+import os
+from util.filewatch import FileWatcher
+from util.health import EndpointUnavailable
+from util.logevents import parse_log_lines
+
+# Bytes at the start of the log compared to tell a rotated file from the one we were reading.
+FINGERPRINT_SIZE = 1024
+# Most bytes fetched and held per read, so catching up on a large backlog runs in constant memory.
+READ_CHUNK = 1024 * 1024
+# A "line" longer than this without a newline is garbage and is skipped.
+MAX_LINE = 64 * 1024
+# Events queued per subscriber before the tailer waits for it to catch up.
+QUEUE_SIZE = 1000
+
+class Subscription:
+    def __init__(self, server, event_types, handler, backlog, commit):
+        self.server = server
+        self.event_types = event_types if isinstance(event_types, tuple) else (event_types,)
+        self.handler = handler
+        self.backlog = backlog
+        self.commit = commit
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        # Set when events were queued since the tailer last waited for them to be handled.
+        self.dirty = False
+        self.task = asyncio.ensure_future(self._deliver())
+
+    async def _deliver(self):
+        # One worker per subscriber: a cog pacing its Discord messages only delays itself.
+        while True:
+            event = await self.queue.get()
+            try:
+                await self.handler(self.server, event)
+            except Exception as e:
+                logging.error(f"Error handling {type(event).__name__} from {self.server.name}: {e}")
+            finally:
+                self.queue.task_done()
+
+class LogTailer:
+    """Reads TheIsle-Shipping.log of one server once, over SFTP or from `local_path`, and queues each event to its subscribers."""
+
+    def __init__(self, server, interval=5, offsets=None, local_path=None, min_interval=None, max_interval=None):
+        self.server = server
+        self.base_interval = interval
+        self.min_interval = min(min_interval or interval, interval)
+        self.max_interval = max(max_interval or interval, interval)
+        self.interval = interval
+        self.offsets = offsets
+        self.local_path = local_path or None
+        self.path = self.local_path or server.file_path
+        self.watcher = FileWatcher(self.local_path) if self.local_path else None
+        self.checkpoint = self._load_checkpoint()
+        # Size of the log when the backlog was first read; lines before it only go to backlog subscribers.
+        self.backlog_end = None
+        self._pending = []
+        self._subscriptions = []
+        self._task = None
+
+    def subscribe(self, event_types, handler, backlog=False, commit=None):
+        """Deliver events of the given types to `handler(server, event)`, then run `commit(server)` before each checkpoint."""
+        if backlog and self.checkpoint is not None:
+            logging.warning(f"{self.server.name} log tailer already started, backlog is not replayed.")
+        self._pending.append((event_types, handler, backlog, commit))
+
+    def unsubscribe(self, handler):
+        self._pending = [entry for entry in self._pending if entry[1] != handler]
+        for subscription in [s for s in self._subscriptions if s.handler == handler]:
+            subscription.task.cancel()
+            self._subscriptions.remove(subscription)
+
+    def start(self):
+        """Start tailing; safe to call from every subscriber."""
+        for event_types, handler, backlog, commit in self._pending:
+            self._subscriptions.append(Subscription(self.server, event_types, handler, backlog, commit))
+        self._pending = []
+        if self._task is None:
+            if self.watcher is not None:
+                self.watcher.start()
+            self._task = asyncio.ensure_future(self._loop())
+
+    async def _loop(self):
+        while True:
+            read = 0
+            try:
+                read = await self.poll()
+            except EndpointUnavailable:
+                pass
+            except Exception as e:
+                logging.error(f"Error reading the log of {self.server.name}: {e}")
+            self.adapt_interval(read)
+            if self.watcher is not None:
+                await self.watcher.wait(self.interval)
+            else:
+                await asyncio.sleep(self.interval)
+
+    def _load_checkpoint(self):
+        # The checkpoint keeps the head of the file, so a rotated or truncated log is read from the start.
+        saved = self.offsets.get(self.server.name) if self.offsets else None
+        if not saved or saved.get("path") != self.path:
+            return None
+        return {"position": saved["position"], "head": bytes.fromhex(saved["head"])}
+
+    def _save_checkpoint(self):
+        if self.offsets:
+            self.offsets.set(self.server.name, {
+                "path": self.path,
+                "position": self.checkpoint["position"],
+                "head": self.checkpoint["head"].hex(),
+            })
+
+    @property
+    def position(self):
+        return self.checkpoint["position"] if self.checkpoint else None
+
+    async def poll(self):
+        first_read = self.checkpoint is None
+        if not first_read:
+            checkpoint = self.checkpoint
+        elif any(s.backlog for s in self._subscriptions):
+            checkpoint = {"position": 0, "head": b""}
+        else:
+            checkpoint = None
+        verify = True
+        carry = b""
+        read = 0
+        while True:
+            if self.local_path:
+                data, checkpoint, rotated, size = await asyncio.to_thread(
+                    self.read_local_chunk, self.local_path, checkpoint, verify
+                )
+            else:
+                data, checkpoint, rotated, size = await self.server.sftp.run(
+                    self.read_chunk, self.path, checkpoint, verify
+                )
+            if first_read and self.backlog_end is None:
+                self.backlog_end = size
+            verify = False
+            read += len(data)
+            if rotated:
+                logging.info(f"The log of {self.server.name} was rotated or truncated, reading it from the start.")
+                self.backlog_end = None
+            start = checkpoint["position"]
+            end = start + len(data)
+            # Lines cut by the chunk boundary wait in `carry` for the rest of their bytes.
+            buffer_start = start - len(carry)
+            buffer = carry + data
+            split = buffer.rfind(b"\n") + 1
+            lines, carry = buffer[:split], buffer[split:]
+            if len(carry) > MAX_LINE:
+                logging.warning(f"Skipping {len(carry)} bytes without a line break in the log of {self.server.name}.")
+                carry = b""
+            # The checkpoint only ever covers complete lines; a partial one is read again next time.
+            done = {"position": end - len(carry), "head": checkpoint["head"]}
+            if lines:
+                backlog, live = self.split_backlog(lines, buffer_start)
+                # Split on b"\n" first so no multi-byte character is ever cut in half.
+                if backlog:
+                    await self.publish(backlog.decode(errors="replace"), backlog_only=True)
+                if live:
+                    await self.publish(live.decode(errors="replace"))
+                # If a commit fails the checkpoint stays where it was and these lines are read again.
+                await self.settle_subscribers()
+            self.checkpoint = done
+            self._save_checkpoint()
+            if self.backlog_end is not None and done["position"] >= self.backlog_end:
+                self.backlog_end = None
+            if not data or end >= size:
+                return read
+            checkpoint = {"position": end, "head": checkpoint["head"]}
+
+    def split_backlog(self, lines, start):
+        """Split complete `lines` read at `start` into those already in the log at startup and newer ones."""
+        if self.backlog_end is None:
+            return b"", lines
+        if start + len(lines) <= self.backlog_end:
+            return lines, b""
+        # A line still being written at startup counts as new.
+        cut = lines.rfind(b"\n", 0, max(0, self.backlog_end - start)) + 1
+        return lines[:cut], lines[cut:]
+
+    def adapt_interval(self, read):
+        """Poll faster while the log grows or players are online, and back off towards `max_interval` while it is idle."""
+        if read:
+            # Come straight back from an idle back-off, then keep halving while the log grows.
+            interval = min(self.interval / 2, self.base_interval)
+        else:
+            interval = self.interval * 1.5
+        details = self.server.server_details.details
+        if details is not None and details.current_players:
+            # Someone is online, so new lines are coming soon.
+            interval = min(interval, self.base_interval)
+        self.interval = min(self.max_interval, max(self.min_interval, interval))
+
+    async def publish(self, text, backlog_only=False):
+        for event in parse_log_lines(text):
+            for subscription in self._subscriptions:
+                if backlog_only and not subscription.backlog:
+                    continue
+                if isinstance(event, subscription.event_types):
+                    # Waits while the subscriber's queue is full.
+                    await subscription.queue.put(event)
+                    subscription.dirty = True
+
+    async def settle_subscribers(self):
+        """Wait until every subscriber handled what was published, then run the commit callbacks."""
+        for subscription in self._subscriptions:
+            if not subscription.dirty:
+                continue
+            await subscription.queue.join()
+            if subscription.commit is not None:
+                subscription.commit(self.server)
+            subscription.dirty = False
+
+    def read_chunk(self, sftp, filepath, checkpoint, verify=True):
+        """Read the next chunk of the log over SFTP, see `next_chunk`."""
+        with sftp.file(filepath, "r") as file:
+            # readv pipelines the SFTP read requests instead of waiting on each 32 KB block in turn.
+            return next_chunk(
+                file.stat().st_size,
+                lambda position, length: b"".join(file.readv([(position, length)])),
+                checkpoint,
+                verify
+            )
+
+    def read_local_chunk(self, filepath, checkpoint, verify=True):
+        """Read the next chunk of a log on this machine, see `next_chunk`."""
+        fd = os.open(filepath, os.O_RDONLY)
+        try:
+            return next_chunk(
+                os.fstat(fd).st_size,
+                lambda position, length: os.pread(fd, length, position),
+                checkpoint,
+                verify
+            )
+        finally:
+            os.close(fd)
+
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for subscription in self._subscriptions:
+            subscription.task.cancel()
+        self._subscriptions = []
+        if self.watcher is not None:
+            self.watcher.close()
+
+def next_chunk(size, read_at, checkpoint, verify=True):
+    """
+    Read up to READ_CHUNK bytes after `checkpoint` (None for the end of the file).
+
+    `read_at(position, length)` reads from the open file. With `verify` the
+    file is first checked against the checkpoint's head and size. Returns
+    (bytes, checkpoint the bytes start at, whether the file was rotated,
+    file size).
+    """
+    def read_head():
+        return read_at(0, min(FINGERPRINT_SIZE, size)) if size else b""
+
+    if checkpoint is None:
+        return b"", {"position": size, "head": read_head()}, False, size
+    position = checkpoint["position"]
+    head = checkpoint["head"]
+    rotated = False
+    if verify:
+        known_head, head = head, read_head()
+        # The head is compared up to what we saw last time; it grows until FINGERPRINT_SIZE.
+        rotated = size < position or head[:len(known_head)] != known_head
+        if rotated:
+            position = 0
+    length = min(READ_CHUNK, size - position)
+    data = read_at(position, length) if length > 0 else b""
+    return data, {"position": position, "head": head}, rotated, size
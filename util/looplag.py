@@ -0,0 +1,55 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+class LoopLagMonitor:
+    """
+    Measures how responsive the event loop is.
+
+    A task sleeps for `interval` seconds over and over; how much later than
+    requested it wakes up is the time the loop spent stuck in something
+    else. The recent samples give the percentiles, and a single stall longer
+    than `warn_threshold` seconds is logged as it happens.
+    """
+
+    def __init__(self, interval=0.25, window=2400, warn_threshold=1.0):
+        self.interval = interval
+        self.warn_threshold = warn_threshold
+        self.samples = deque(maxlen=window)
+        self.max_lag = 0.0
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._loop())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - started - self.interval)
+            self.samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+            if self.warn_threshold and lag >= self.warn_threshold:
+                logging.warning(f"Event loop was blocked for {lag:.2f}s.")
+
+    def percentile(self, fraction):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+    def stats(self):
+        return {
+            "current": self.samples[-1] if self.samples else 0.0,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": self.max_lag,
+        }
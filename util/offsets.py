@@ -0,0 +1,39 @@
+import json
+import logging
+import os
+
+class OffsetStore:
+    """Small JSON-file key/value store, used for the read positions of the tailed logs and the status messages."""
+
+    def __init__(self, path):
+        self.path = path
+        self.data = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+        except ValueError as e:
+            logging.warning(f"Ignoring unreadable {self.path}, starting from empty: {e}")
+            return {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value):
+        if self.data.get(key) == value:
+            return
+        self.data[key] = value
+        self.save()
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Write a copy and swap it in, so a crash mid-write never leaves a torn file.
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(self.data, file, indent=4)
+        os.replace(temp_path, self.path)
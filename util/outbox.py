@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import time
+from collections import deque
+import aiohttp
+import nextcord
+
+MESSAGE_LIMIT = 2000
+EMBEDS_PER_MESSAGE = 10
+EMBED_CHARACTERS_PER_MESSAGE = 6000
+RETRY_DELAY = 2
+
+def retryable(error):
+    """Whether a failed send may work when tried again: a Discord server error, a 429 or a dropped connection."""
+    if isinstance(error, nextcord.HTTPException):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError))
+
+class ChannelQueue:
+    """
+    Pending lines or embeds for one channel.
+
+    Posted by a single worker as the bot user, or by one worker per webhook
+    when `webhooks` is given; several webhooks may post batches slightly
+    out of order.
+    """
+
+    def __init__(self, outbox, channel, maxsize, webhooks=None):
+        self.outbox = outbox
+        self.channel = channel
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.held = None
+        self.tasks = [asyncio.ensure_future(self._start(webhooks))]
+
+    async def _start(self, webhooks):
+        senders = []
+        if webhooks is not None:
+            try:
+                senders = await webhooks.senders(self.channel)
+            except Exception as e:
+                logging.error(f"Error setting up webhooks for #{self.channel}, posting as the bot: {e}")
+        for send in senders or [self.channel.send]:
+            self._spawn(send)
+
+    def _spawn(self, send):
+        task = asyncio.ensure_future(self._worker(send))
+        task.add_done_callback(lambda task: self._restart(task, send))
+        self.tasks.append(task)
+
+    def _restart(self, task, send):
+        # Workers only stop when cancelled; anything else would leave the queue undrained.
+        if task in self.tasks:
+            self.tasks.remove(task)
+        if task.cancelled():
+            return
+        logging.error(f"Outbox worker for #{self.channel} stopped ({task.exception()!r}), restarting it.")
+        self._spawn(send)
+
+    @property
+    def depth(self):
+        return self.queue.qsize() + (self.held is not None)
+
+    def _next(self):
+        if self.held is not None:
+            item, self.held = self.held, None
+            return item
+        return self.queue.get_nowait()
+
+    def _batch(self, first):
+        """Take `first` plus whatever queued items of the same kind fit in one message."""
+        batch = [first]
+        is_embed = first[0] is None
+        size = len(first[1]) if is_embed else len(first[0])
+        while not self.queue.empty() or self.held is not None:
+            item = self._next()
+            if is_embed:
+                fits = item[0] is None and len(batch) < EMBEDS_PER_MESSAGE and size + len(item[1]) <= EMBED_CHARACTERS_PER_MESSAGE
+                added = len(item[1]) if item[0] is None else 0
+            else:
+                fits = item[0] is not None and size + 1 + len(item[0]) <= MESSAGE_LIMIT
+                added = 1 + len(item[0]) if item[0] is not None else 0
+            if not fits:
+                self.held = item
+                break
+            batch.append(item)
+            size += added
+        return batch
+
+    async def _worker(self, send):
+        while True:
+            first = self._next() if self.held is not None else await self.queue.get()
+            batch = [first]
+            try:
+                batch = self._batch(first)
+                await self._post(send, batch)
+            finally:
+                # Counted even for failed batches, so `DiscordOutbox.close` does not wait for them.
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def _post(self, send, batch):
+        try:
+            await self._attempt(send, batch)
+        except Exception as e:
+            logging.error(f"Error sending {len(batch)} queued messages to #{self.channel}: {e}")
+            if send == self.channel.send:
+                self.outbox.drop(self.channel, batch)
+                return
+            try:
+                await self._attempt(self.channel.send, batch)
+            except Exception as e:
+                logging.error(f"Error sending {len(batch)} queued messages to #{self.channel} as the bot: {e}")
+                self.outbox.drop(self.channel, batch)
+                return
+        self.outbox.record(batch)
+
+    async def _attempt(self, send, batch):
+        """Send `batch`, trying once more after a retryable error."""
+        try:
+            await self._send(send, batch)
+        except Exception as e:
+            if not retryable(e):
+                raise
+            logging.warning(f"Retrying {len(batch)} queued messages to #{self.channel} in {RETRY_DELAY}s: {e}")
+            await asyncio.sleep(RETRY_DELAY)
+            await self._send(send, batch)
+
+    async def _send(self, send, batch):
+        # nextcord holds the request until its rate limit bucket (the channel's
+        # or the webhook's) resets, going by X-RateLimit-Remaining/Reset-After.
+        if batch[0][0] is None:
+            await send(embeds=[item[1] for item in batch])
+        else:
+            await send(content="\n".join(item[0] for item in batch))
+
+class DiscordOutbox:
+    """
+    Shared outgoing queue for the log feeds, one queue per channel.
+
+    Consecutive text lines are joined into messages of up to 2000
+    characters and consecutive embeds are sent up to ten at a time, so a
+    busy chat costs a handful of messages instead of one per line. Each
+    channel posts as fast as Discord's rate limits allow. `send` only
+    waits when a channel already has `maxsize` items queued. Feeds enabled
+    in `webhooks` (a WebhookPool) are posted through its webhooks.
+    """
+
+    def __init__(self, maxsize=5000, window=1000, webhooks=None):
+        self.maxsize = maxsize
+        self.webhooks = webhooks
+        self.channels = {}
+        self.lags = deque(maxlen=window)
+        self.sent_messages = 0
+        self.sent_items = 0
+        self.dropped_items = 0
+
+    def _queue(self, channel, feed):
+        webhooks = self.webhooks if self.webhooks is not None and self.webhooks.enabled_for(feed) else None
+        key = (channel.id, webhooks is not None)
+        queue = self.channels.get(key)
+        if queue is None:
+            queue = self.channels[key] = ChannelQueue(self, channel, self.maxsize, webhooks)
+        return queue
+
+    async def send(self, channel, content=None, embed=None, feed=None):
+        if content is not None and len(content) > MESSAGE_LIMIT:
+            content = content[:MESSAGE_LIMIT]
+        await self._queue(channel, feed).queue.put((content, embed, time.monotonic()))
+
+    def record(self, batch):
+        now = time.monotonic()
+        self.lags.extend(now - item[2] for item in batch)
+        self.sent_messages += 1
+        self.sent_items += len(batch)
+
+    def drop(self, channel, batch):
+        self.dropped_items += len(batch)
+        kind = "embeds" if batch[0][0] is None else "lines"
+        logging.error(f"Dropped {len(batch)} {kind} for #{channel} ({self.dropped_items} dropped since startup).")
+
+    def stats(self):
+        ordered = sorted(self.lags)
+
+        def percentile(fraction):
+            return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+        return {
+            "depth": sum(queue.depth for queue in self.channels.values()),
+            "p50": percentile(0.5),
+            "p95": percentile(0.95),
+            "max": ordered[-1] if ordered else 0.0,
+            "messages": self.sent_messages,
+            "items": self.sent_items,
+            "dropped": self.dropped_items,
+        }
+
+    async def close(self, timeout=10):
+        """Post what is still queued, waiting up to `timeout` seconds, then stop the workers."""
+        queues = list(self.channels.values())
+        try:
+            await asyncio.wait_for(asyncio.gather(*(queue.queue.join() for queue in queues)), timeout)
+        except asyncio.TimeoutError:
+            logging.warning(f"Outbox closed with {sum(queue.depth for queue in queues)} messages still queued.")
+        for queue in queues:
+            for task in queue.tasks:
+                task.cancel()
+        self.channels = {}
+        if self.webhooks is not None:
+            await self.webhooks.close()
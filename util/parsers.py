@@ -0,0 +1,130 @@
+import re
+from dataclasses import dataclass
+
+# Evrima replies are "Key: value" pairs separated by ", ". A value runs until
+# the next ", Key:" or the end of the line, so names containing commas survive
+# and keys the server adds or reorders are simply collected.
+KEY_VALUE_PATTERN = re.compile(r"(\w+):[ \t]*([^\n]*?)(?=,\s*\w+:|,?[ \t]*\n|,?[ \t]*$)")
+INT_PATTERN = re.compile(r"-?\d+")
+FLOAT_PATTERN = re.compile(r"-?\d+\.\d*")
+
+def convert_value(value):
+    value = value.strip()
+    if value == "true":
+        return True
+    if value == "false":
+        return False
+    if INT_PATTERN.fullmatch(value):
+        return int(value)
+    if FLOAT_PATTERN.fullmatch(value):
+        return float(value)
+    return value
+
+def _as_int(value):
+    return value if isinstance(value, int) and not isinstance(value, bool) else 0
+
+def scan_fields(response):
+    """Single pass over a reply, yielding (key, raw value) in order."""
+    for match in KEY_VALUE_PATTERN.finditer(response or ""):
+        yield match.group(1), match.group(2).strip()
+
+@dataclass
+class ServerDetails:
+    __slots__ = ("name", "map", "current_players", "max_players", "day_length", "night_length", "fields")
+    name: str
+    map: str
+    current_players: int
+    max_players: int
+    day_length: int
+    night_length: int
+    fields: dict  # every key in the reply, including ones not mapped above
+
+@dataclass
+class PlayerListEntry:
+    __slots__ = ("steam_id", "name")
+    steam_id: str
+    name: str
+
+@dataclass
+class PlayerData:
+    __slots__ = ("name", "steam_id", "dino_class", "growth", "health", "stamina", "hunger", "thirst", "location", "fields")
+    name: str
+    steam_id: str
+    dino_class: str
+    growth: float
+    health: float
+    stamina: float
+    hunger: float
+    thirst: float
+    location: str
+    fields: dict
+
+def parse_server_details(response):
+    """Parse a server details (0x12) reply, or return None if it has no server fields."""
+    fields = {key: convert_value(value) for key, value in scan_fields(response)}
+    if not any(key.startswith("Server") for key in fields):
+        return None
+    # Older servers glue the "ServerDetails" header onto the first key.
+    name = fields.get("ServerDetailsServerName", fields.get("ServerName", "N/A"))
+    return ServerDetails(
+        name=str(name),
+        map=str(fields.get("ServerMap", "N/A")),
+        current_players=_as_int(fields.get("ServerCurrentPlayers")),
+        max_players=_as_int(fields.get("ServerMaxPlayers")),
+        day_length=_as_int(fields.get("ServerDayLengthMinutes")),
+        night_length=_as_int(fields.get("ServerNightLengthMinutes")),
+        fields=fields,
+    )
+
+def parse_player_list(response):
+    """Parse a player list (0x40) reply: "PlayerList" then SteamID and name lines in turn."""
+    players = []
+    if not response or "PlayerList" not in response:
+        return players
+    lines = response.strip().split('\n')
+    for i in range(1, len(lines) - 1, 2):
+        steam_id = lines[i].strip().replace(',', '')
+        player_name = lines[i + 1].strip().replace(',', '')
+        if steam_id:
+            players.append(PlayerListEntry(steam_id, player_name))
+    return players
+
+def _player_data(fields):
+    def number(key):
+        value = convert_value(fields.get(key, "0"))
+        return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else 0.0
+
+    return PlayerData(
+        name=fields.get("PlayerDataName", ""),
+        steam_id=fields.get("PlayerID", ""),
+        dino_class=fields.get("Class", ""),
+        growth=number("Growth"),
+        health=number("Health"),
+        stamina=number("Stamina"),
+        hunger=number("Hunger"),
+        thirst=number("Thirst"),
+        location=fields.get("Location", ""),
+        fields=fields,
+    )
+
+def parse_player_data(response):
+    """
+    Parse a player data (0x77) reply into {steam_id: PlayerData}.
+
+    Works for a single player and for the bulk reply; every "PlayerDataName"
+    key starts a new record.
+    """
+    players = {}
+    fields = None
+    for key, value in scan_fields(response):
+        if key == "PlayerDataName":
+            if fields and fields.get("PlayerID"):
+                player = _player_data(fields)
+                players[player.steam_id] = player
+            fields = {}
+        if fields is not None:
+            fields[key] = value
+    if fields and fields.get("PlayerID"):
+        player = _player_data(fields)
+        players[player.steam_id] = player
+    return players
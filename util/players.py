@@ -0,0 +1,180 @@
+import json
+import logging
+import os
+import sqlite3
+from collections import OrderedDict
+from util.logevents import ConnectEvent
+from util.playersearch import PlayerSearchIndex
+
+MAX_PENDING = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    steam_id TEXT NOT NULL,
+    eos_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (steam_id, eos_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS players_eos_id ON players (eos_id);
+CREATE INDEX IF NOT EXISTS players_name ON players (name COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+UPSERT = """
+INSERT INTO players (steam_id, eos_id, name) VALUES (?, ?, ?)
+ON CONFLICT (steam_id, eos_id) DO UPDATE SET name = excluded.name WHERE name != excluded.name
+"""
+
+def as_player(row):
+    return {"Name": row[0], "EOS_Id": row[1], "Steam_Id": row[2]}
+
+class PlayerRegistry:
+    """
+    Every player seen in the logs, in an SQLite database (data/players.db).
+
+    Players are keyed by Steam ID and EOS ID, with indexes for lookups by
+    EOS ID and name. `upsert` adds new players and renames known ones,
+    writing into an open transaction that `save` commits, so a batch of
+    new players costs one commit. Connections still
+    waiting for their join line are kept in the same database with
+    `save_pending`, so they survive a restart too. On first use the
+    players of the old data/players.json are imported; the JSON file is
+    left in place; entries missing a name or ID are skipped.
+
+    `find` is answered from a PlayerSearchIndex loaded at startup and
+    updated with every new or renamed player.
+    """
+
+    def __init__(self, path=os.path.join("data", "players.db"), legacy_path=os.path.join("data", "players.json")):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        # With WAL a commit only waits for the log write, not a full fsync of the database.
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self.index = None
+        self.migrate(legacy_path)
+        self.index = PlayerSearchIndex()
+        self.index.extend(self.db.execute("SELECT name, eos_id, steam_id FROM players"))
+
+    def migrate(self, legacy_path):
+        if self.db.execute("SELECT 1 FROM meta WHERE key = 'migrated_json'").fetchone():
+            return
+        players = []
+        try:
+            with open(legacy_path, "r", encoding="utf-8") as file:
+                players = json.load(file)
+        except FileNotFoundError:
+            pass
+        except ValueError as e:
+            logging.error(f"Could not read {legacy_path}, not importing it: {e}")
+            return
+        rows = []
+        for number, p in enumerate(players):
+            try:
+                rows.append((str(p["Name"]), str(p["EOS_Id"]), str(p["Steam_Id"])))
+            except (KeyError, TypeError) as e:
+                logging.warning(f"Skipping malformed entry {number} in {legacy_path}: {e!r}")
+        added = self.upsert_many(rows)
+        self.db.execute("INSERT INTO meta (key, value) VALUES ('migrated_json', ?)", (legacy_path,))
+        self.db.commit()
+        if players:
+            logging.info(f"Imported {added} players from {legacy_path} into {self.path}.")
+
+    def _write(self, name, eos_id, steam_id):
+        """Insert a new player or rename a known one; returns True if the player was new."""
+        row = self.db.execute(
+            "SELECT name FROM players WHERE steam_id = ? AND eos_id = ?", (steam_id, eos_id)
+        ).fetchone()
+        if row is not None and row[0] == name:
+            return False
+        self.db.execute(UPSERT, (steam_id, eos_id, name))
+        if row is not None and self.index is not None:
+            self.index.rename(name, eos_id, steam_id)
+        return row is None
+
+    def upsert(self, name, eos_id, steam_id):
+        """Record a player or their new name; returns True if this EOS/Steam ID pair was new."""
+        if not self._write(name, eos_id, steam_id):
+            return False
+        if self.index is not None:
+            self.index.add(name, eos_id, steam_id)
+        return True
+
+    def upsert_many(self, players):
+        """Record (name, eos_id, steam_id) tuples, renaming known players; returns how many were new."""
+        if self.index is None:
+            # Before the search index is loaded (the JSON import) one executemany is enough.
+            before = self.count()
+            self.db.executemany(UPSERT, ((steam_id, eos_id, name) for name, eos_id, steam_id in players))
+            return self.count() - before
+        added = [player for player in players if self._write(*player)]
+        self.index.extend(added)
+        return len(added)
+
+    def pending(self, key):
+        """The unpaired connections last stored under `key` with `save_pending`."""
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (f"pending:{key}",)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def save_pending(self, key, pending):
+        self.db.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            (f"pending:{key}", json.dumps(pending))
+        )
+
+    def save(self):
+        if not self.db.in_transaction:
+            return False
+        self.db.commit()
+        return True
+
+    def count(self):
+        return self.db.execute("SELECT COUNT(*) FROM players").fetchone()[0]
+
+    def by_steam_id(self, steam_id):
+        row = self.db.execute(
+            "SELECT name, eos_id, steam_id FROM players WHERE steam_id = ? LIMIT 1", (steam_id,)
+        ).fetchone()
+        return as_player(row) if row else None
+
+    def find(self, term, limit=25):
+        """Best matches for a name, EOS ID or Steam ID (or the start or part of one)."""
+        return [as_player(row) for row in self.index.search(term, limit)]
+
+    def all(self):
+        for row in self.db.execute("SELECT name, eos_id, steam_id FROM players ORDER BY name COLLATE NOCASE"):
+            yield as_player(row)
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+class PlayerPairing:
+    """
+    Matches the "Player Connecting" line (EOS ID) with the join line (name) of the same Steam ID.
+
+    Either line may come first. Connections that never join are dropped
+    once more than `max_pending` players are waiting.
+    """
+
+    def __init__(self, max_pending=MAX_PENDING, pending=None):
+        self.max_pending = max_pending
+        self.pending = OrderedDict(pending or {})
+
+    def add(self, event):
+        """Feed a ConnectEvent or JoinEvent; returns (name, eos_id, steam_id) once both were seen."""
+        entry = self.pending.setdefault(event.steam_id, {})
+        if isinstance(event, ConnectEvent):
+            entry["eos_id"] = event.eos_id
+        else:
+            entry["name"] = event.name
+        if "eos_id" in entry and "name" in entry:
+            del self.pending[event.steam_id]
+            return entry["name"], entry["eos_id"], event.steam_id
+        if len(self.pending) > self.max_pending:
+            self.pending.popitem(last=False)
+        return None
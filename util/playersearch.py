@@ -0,0 +1,178 @@
+from array import array
+from bisect import bisect_left
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def fold(text):
+    folded = text.casefold()
+    # Share the original string when folding changed nothing.
+    return text if folded == text else folded
+
+class PrefixList:
+    """Keys kept sorted next to the player number of each, for prefix lookups by binary search."""
+
+    def __init__(self):
+        self.keys = []
+        self.numbers = array("I")
+
+    def add(self, key, number):
+        position = bisect_left(self.keys, key)
+        self.keys.insert(position, key)
+        self.numbers.insert(position, number)
+
+    def remove(self, key, number):
+        position = bisect_left(self.keys, key)
+        while position < len(self.keys) and self.keys[position] == key:
+            if self.numbers[position] == number:
+                del self.keys[position]
+                del self.numbers[position]
+                return
+            position += 1
+
+    def extend(self, keys, numbers):
+        keys = self.keys + keys
+        numbers = self.numbers + array("I", numbers)
+        # The existing keys are already sorted, which Timsort merges in close to linear time.
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self.keys = [keys[i] for i in order]
+        self.numbers = array("I", (numbers[i] for i in order))
+
+    def prefixed(self, prefix, limit):
+        matches = []
+        position = bisect_left(self.keys, prefix)
+        while position < len(self.keys) and len(matches) < limit and self.keys[position].startswith(prefix):
+            matches.append((self.keys[position], self.numbers[position]))
+            position += 1
+        return matches
+
+class PlayerSearchIndex:
+    """
+    In-memory search over player names, Steam IDs and EOS IDs.
+
+    Names are indexed by their lowercased trigrams, each with a compact
+    list of player numbers; a substring search only checks the players
+    listed under the query's rarest trigram. Names and IDs are also kept
+    in sorted lists, which answer prefix searches with a binary search.
+    Players are added one at a time as they are recorded, or in bulk, and
+    renamed in place.
+
+    Results are ranked: exact ID, exact name, name prefix, ID prefix, then
+    names containing the term. Terms shorter than three characters only
+    match prefixes.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.eos_ids = []
+        self.steam_ids = []
+        self.folded = []
+        self.grams = {}
+        self.name_keys = PrefixList()
+        self.eos_keys = PrefixList()
+        self.steam_keys = PrefixList()
+
+    def __len__(self):
+        return len(self.names)
+
+    def _append(self, name, eos_id, steam_id):
+        number = len(self.names)
+        folded = fold(name)
+        self.names.append(name)
+        self.eos_ids.append(eos_id)
+        self.steam_ids.append(steam_id)
+        self.folded.append(folded)
+        for gram in trigrams(folded):
+            postings = self.grams.get(gram)
+            if postings is None:
+                postings = self.grams[gram] = array("I")
+            postings.append(number)
+        return number, folded
+
+    def add(self, name, eos_id, steam_id):
+        number, folded = self._append(name, eos_id, steam_id)
+        self.name_keys.add(folded, number)
+        self.eos_keys.add(fold(eos_id), number)
+        self.steam_keys.add(steam_id, number)
+
+    def _number(self, eos_id, steam_id):
+        for key, number in self.steam_keys.prefixed(steam_id, len(self.names)):
+            if key == steam_id and self.eos_ids[number] == eos_id:
+                return number
+        return None
+
+    def rename(self, name, eos_id, steam_id):
+        """Change the indexed name of a known player; returns False if the player is not indexed."""
+        number = self._number(eos_id, steam_id)
+        if number is None:
+            return False
+        old = self.folded[number]
+        folded = fold(name)
+        self.names[number] = name
+        self.folded[number] = folded
+        self.name_keys.remove(old, number)
+        self.name_keys.add(folded, number)
+        # Postings of trigrams the new name lacks are left behind; `_containing` checks the name itself.
+        for gram in trigrams(folded) - trigrams(old):
+            postings = self.grams.get(gram)
+            if postings is None:
+                postings = self.grams[gram] = array("I")
+            postings.append(number)
+        return True
+
+    def extend(self, players):
+        """Add many (name, eos_id, steam_id) rows, re-sorting the prefix lists once."""
+        players = list(players)
+        if len(players) * 1000 < len(self.names):
+            # A handful of rows is cheaper to insert in place than to re-sort everything.
+            for player in players:
+                self.add(*player)
+            return
+        first = len(self.names)
+        for name, eos_id, steam_id in players:
+            self._append(name, eos_id, steam_id)
+        numbers = range(first, len(self.names))
+        if not numbers:
+            return
+        self.name_keys.extend(self.folded[first:], numbers)
+        self.eos_keys.extend([fold(eos_id) for eos_id in self.eos_ids[first:]], numbers)
+        self.steam_keys.extend(self.steam_ids[first:], numbers)
+
+    def player(self, number):
+        return self.names[number], self.eos_ids[number], self.steam_ids[number]
+
+    def _containing(self, folded):
+        grams = trigrams(folded)
+        postings = [self.grams.get(gram) for gram in grams]
+        if not grams or any(p is None for p in postings):
+            return
+        for number in min(postings, key=len):
+            if folded in self.folded[number]:
+                yield number
+
+    def search(self, term, limit=25):
+        """Up to `limit` (name, eos_id, steam_id) rows matching `term`, best first."""
+        term = term.strip()
+        folded = term.casefold()
+        if not folded or limit <= 0:
+            return []
+        ids = self.steam_keys.prefixed(term, limit) + self.eos_keys.prefixed(folded, limit)
+        names = self.name_keys.prefixed(folded, limit)
+        ranked = [
+            (number for key, number in ids if key in (term, folded)),
+            (number for key, number in names if key == folded),
+            (number for key, number in names if key != folded),
+            (number for key, number in ids if key not in (term, folded)),
+        ]
+        if len(folded) >= 3:
+            ranked.append(self._containing(folded))
+        found = []
+        seen = set()
+        for numbers in ranked:
+            for number in numbers:
+                if number not in seen:
+                    seen.add(number)
+                    found.append(self.player(number))
+                    if len(found) >= limit:
+                        return found
+        return found
@@ -0,0 +1,387 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import socket
+import time
+from contextlib import asynccontextmanager
+from gamercon_async import EvrimaRCON
+from util.health import EndpointHealth, EndpointUnavailable
+
+# Evrima RCON opcodes
+RCON_ANNOUNCE = 0x10
+RCON_DIRECTMESSAGE = 0x11
+RCON_SERVERDETAILS = 0x12
+RCON_WIPECORPSES = 0x13
+RCON_UPDATEPLAYABLES = 0x15
+RCON_BANPLAYER = 0x20
+RCON_KICKPLAYER = 0x30
+RCON_GETPLAYERLIST = 0x40
+RCON_SAVE = 0x50
+RCON_GETPLAYERDATA = 0x77
+RCON_TOGGLEWHITELIST = 0x81
+RCON_ADDWHITELIST = 0x82
+RCON_REMOVEWHITELIST = 0x83
+RCON_TOGGLEGLOBALCHAT = 0x84
+RCON_TOGGLEHUMANS = 0x86
+RCON_TOGGLEAI = 0x90
+
+# Bytes asked for per read of a reply.
+READ_SIZE = 4096
+# Commands whose reply can run to many TCP segments when sent without a
+# payload (every player); these always wait for the socket to go quiet.
+BULKY_OPCODES = {RCON_GETPLAYERLIST, RCON_GETPLAYERDATA}
+
+# Scheduler priority classes, lower is served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BACKGROUND = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_NORMAL: "normal",
+    PRIORITY_BACKGROUND: "background",
+}
+
+class RconError(Exception):
+    pass
+
+class RconUnavailable(RconError, EndpointUnavailable):
+    pass
+
+def build_command(opcode, payload=b''):
+    if isinstance(payload, str):
+        payload = payload.encode()
+    return b'\x02' + bytes([opcode]) + payload + b'\x00'
+
+class RconConnection(EvrimaRCON):
+    """A single authenticated RCON socket that is kept open between commands."""
+
+    def __init__(self, host, port, password, timeout=10, read_grace=0.05):
+        super().__init__(host, port, password)
+        self.timeout = timeout
+        self.read_grace = read_grace
+        self.reader = None
+        self.writer = None
+        self.last_used = 0.0
+
+    @property
+    def connected(self):
+        return (
+            self.writer is not None
+            and not self.writer.is_closing()
+            and not self.reader.at_eof()
+        )
+
+    async def connect(self):
+        await self.close()
+        # EvrimaRCON reports failures as strings instead of raising.
+        result = await super().connect()
+        if result != "Connected":
+            self.reader = self.writer = None
+            raise RconError(result)
+        sock = self.writer.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        self.last_used = time.monotonic()
+
+    async def request(self, command_bytes):
+        try:
+            self.writer.write(command_bytes)
+            await self.writer.drain()
+            chunks = [await asyncio.wait_for(self.reader.read(READ_SIZE), timeout=self.timeout)]
+            if not chunks[0]:
+                raise RconError("Connection closed by server")
+            # Replies have no length prefix. A short reply that came in one read
+            # shorter than the buffer and ends a line is complete; anything else
+            # is drained until the socket goes quiet, since leftover bytes would
+            # be returned as the reply to the next command on this connection.
+            if (
+                (command_bytes[1] in BULKY_OPCODES and len(command_bytes) == 3)
+                or len(chunks[0]) >= READ_SIZE
+                or not chunks[0].endswith((b'\n', b'\x00'))
+            ):
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(self.reader.read(READ_SIZE), timeout=self.read_grace)
+                    except asyncio.TimeoutError:
+                        break
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+        except asyncio.CancelledError:
+            # The reply may still arrive; drop the socket so it is not read as the next command's.
+            self.writer.close()
+            raise
+        except (OSError, asyncio.TimeoutError) as e:
+            await self.close()
+            raise RconError(f"Error sending command: {e}") from e
+        self.last_used = time.monotonic()
+        return b''.join(chunks).decode(errors='replace')
+
+    async def close(self):
+        writer, self.reader, self.writer = self.writer, None, None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+class RconScheduler:
+    """
+    Decides which queued RCON command runs next.
+
+    Waiting commands are served by priority class, then in arrival order.
+    A command only starts when a connection slot is free, the global
+    requests-per-second budget has a token left and its opcode is below its
+    concurrency limit. Running commands are never interrupted, so limiting
+    bulky opcodes such as GETPLAYERDATA keeps a slot free for admin actions.
+    """
+
+    def __init__(self, capacity, rate=0, opcode_limits=None):
+        self.capacity = capacity
+        self.rate = rate
+        self.opcode_limits = opcode_limits or {}
+        self.active = 0
+        self._opcode_active = {}
+        self._tokens = float(rate)
+        self._refilled_at = time.monotonic()
+        self._waiting = []
+        self._counter = itertools.count()
+        self._timer = None
+        self._stats = {
+            priority: {"sent": 0, "total_wait": 0.0, "max_wait": 0.0}
+            for priority in PRIORITY_NAMES
+        }
+
+    @asynccontextmanager
+    async def slot(self, opcode, priority=PRIORITY_NORMAL):
+        queued_at = time.monotonic()
+        future = asyncio.get_event_loop().create_future()
+        heapq.heappush(self._waiting, (priority, next(self._counter), opcode, future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Granted just before the caller was cancelled; hand the slot back.
+            if future.done() and not future.cancelled():
+                self._release(opcode)
+            raise
+        self._record(priority, time.monotonic() - queued_at)
+        try:
+            yield
+        finally:
+            self._release(opcode)
+
+    def _record(self, priority, waited):
+        stats = self._stats.setdefault(priority, {"sent": 0, "total_wait": 0.0, "max_wait": 0.0})
+        stats["sent"] += 1
+        stats["total_wait"] += waited
+        stats["max_wait"] = max(stats["max_wait"], waited)
+
+    def _release(self, opcode):
+        self.active -= 1
+        self._opcode_active[opcode] -= 1
+        self._dispatch()
+
+    async def throttle(self, priority=PRIORITY_NORMAL):
+        """Wait for one token of the rate budget, for commands sent inside an already held slot."""
+        queued_at = time.monotonic()
+        while self.rate:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                break
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+        self._record(priority, time.monotonic() - queued_at)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(float(self.rate), self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _dispatch(self):
+        self._waiting = [entry for entry in self._waiting if not entry[3].done()]
+        heapq.heapify(self._waiting)
+        for entry in sorted(self._waiting):
+            if self.active >= self.capacity:
+                return
+            opcode = entry[2]
+            limit = self.opcode_limits.get(opcode)
+            if limit is not None and self._opcode_active.get(opcode, 0) >= limit:
+                continue
+            if self.rate:
+                self._refill()
+                if self._tokens < 1:
+                    self._schedule_refill()
+                    return
+                self._tokens -= 1
+            self._waiting.remove(entry)
+            self.active += 1
+            self._opcode_active[opcode] = self._opcode_active.get(opcode, 0) + 1
+            entry[3].set_result(None)
+        heapq.heapify(self._waiting)
+
+    def _schedule_refill(self):
+        if self._timer is not None:
+            return
+
+        def refill():
+            self._timer = None
+            self._dispatch()
+
+        delay = (1 - self._tokens) / self.rate
+        self._timer = asyncio.get_event_loop().call_later(delay, refill)
+
+    def stats(self):
+        depth = {}
+        for priority, *_ in self._waiting:
+            depth[priority] = depth.get(priority, 0) + 1
+        result = {}
+        for priority, stats in self._stats.items():
+            sent = stats["sent"]
+            result[PRIORITY_NAMES.get(priority, str(priority))] = {
+                "queued": depth.get(priority, 0),
+                "sent": sent,
+                "avg_wait": stats["total_wait"] / sent if sent else 0.0,
+                "max_wait": stats["max_wait"],
+            }
+        return result
+
+class RconPool:
+    """
+    Small pool of long-lived RCON connections shared by every cog.
+
+    Each connection handles one command at a time. Connections are opened
+    lazily, re-established when the server drops them and checked by a
+    keepalive task while idle. Commands sent through `send` are ordered by
+    an RconScheduler and refused straight away while `health` reports the
+    server as down.
+    """
+
+    def __init__(self, host, port, password, size=2, keepalive=60, timeout=10, rate=0, opcode_limits=None, health=None):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.size = max(1, size)
+        self.keepalive = keepalive
+        self.timeout = timeout
+        self.scheduler = RconScheduler(self.size, rate=rate, opcode_limits=opcode_limits)
+        self.health = health or EndpointHealth("RCON")
+        self._idle = None
+        self._connections = []
+        self._keepalive_task = None
+
+    def _start(self):
+        if self._idle is not None:
+            return
+        self._idle = asyncio.LifoQueue()
+        for _ in range(self.size):
+            conn = RconConnection(self.host, self.port, self.password, timeout=self.timeout)
+            self._connections.append(conn)
+            self._idle.put_nowait(conn)
+        if self.keepalive:
+            self._keepalive_task = asyncio.ensure_future(self._keepalive_loop())
+
+    @asynccontextmanager
+    async def connection(self):
+        """Lease one connection exclusively, e.g. to send several commands in a row."""
+        self._start()
+        conn = await self._idle.get()
+        try:
+            if not conn.connected:
+                await conn.connect()
+            yield conn
+        finally:
+            self._idle.put_nowait(conn)
+
+    async def send(self, opcode, payload=b'', priority=PRIORITY_NORMAL):
+        if not self.health.allow():
+            raise RconUnavailable(f"RCON server unavailable, retrying in {self.health.retry_in:.0f}s")
+        command = build_command(opcode, payload)
+        try:
+            async with self.scheduler.slot(opcode, priority), self.connection() as conn:
+                try:
+                    response = await conn.request(command)
+                except RconError:
+                    # The server may have closed an idle socket; retry once on a fresh one.
+                    logging.info("RCON connection to %s:%s dropped, reconnecting.", self.host, self.port)
+                    await conn.connect()
+                    response = await conn.request(command)
+        except RconError as e:
+            self.health.record_failure(e)
+            raise
+        self.health.record_success()
+        return response
+
+    async def send_batch(self, commands, priority=PRIORITY_NORMAL):
+        """
+        Send (opcode, payload) commands back to back over one leased connection.
+
+        The batch holds a single scheduler slot for its whole run, leaving the
+        rest of the pool to other commands, and each command still spends a
+        token of the rate budget. Returns a (response, error) pair per command;
+        one failing command does not stop the others.
+        """
+        if not commands:
+            return []
+        if not self.health.allow():
+            raise RconUnavailable(f"RCON server unavailable, retrying in {self.health.retry_in:.0f}s")
+        results = []
+        try:
+            async with self.scheduler.slot(commands[0][0], priority), self.connection() as conn:
+                for index, (opcode, payload) in enumerate(commands):
+                    if index:
+                        await self.scheduler.throttle(priority)
+                    command = build_command(opcode, payload)
+                    try:
+                        try:
+                            response = await conn.request(command)
+                        except RconError:
+                            await conn.connect()
+                            response = await conn.request(command)
+                    except RconError as e:
+                        self.health.record_failure(e)
+                        results.append((None, e))
+                        if not self.health.available:
+                            # The circuit opened mid-batch; don't keep hammering a dead server.
+                            error = RconUnavailable(f"RCON server unavailable, retrying in {self.health.retry_in:.0f}s")
+                            results.extend((None, error) for _ in commands[index + 1:])
+                            break
+                        continue
+                    self.health.record_success()
+                    results.append((response, None))
+        except RconError as e:
+            # Raised while opening the leased connection, before any command was sent.
+            self.health.record_failure(e)
+            raise
+        return results
+
+    async def _keepalive_loop(self):
+        while True:
+            await asyncio.sleep(self.keepalive)
+            if not self.health.available:
+                continue
+            # Only touch connections nobody is using right now.
+            idle = []
+            while not self._idle.empty():
+                idle.append(self._idle.get_nowait())
+            stale = [conn for conn in idle if conn.writer is not None and not conn.connected]
+            for conn in idle:
+                if conn not in stale:
+                    self._idle.put_nowait(conn)
+            for conn in stale:
+                try:
+                    await conn.connect()
+                except RconError as e:
+                    logging.warning(f"RCON keepalive reconnect failed: {e}")
+                finally:
+                    self._idle.put_nowait(conn)
+
+    async def close(self):
+        if self._keepalive_task:
+            self._keepalive_task.cancel()
+            self._keepalive_task = None
+        for conn in self._connections:
+            await conn.close()
@@ -0,0 +1,73 @@
+import asyncio
+import logging
+import time
+from util.rcon import RCON_SERVERDETAILS, PRIORITY_BACKGROUND, RconUnavailable
+from util.parsers import parse_server_details
+
+class ServerDetailsCache:
+    """
+    Shared, parsed result of the server details request (0x12).
+
+    A snapshot younger than `ttl` seconds is served from memory. When it
+    expires, the first caller starts one request and every concurrent caller
+    awaits that same request instead of sending its own. A caller with a
+    higher priority than the request in flight (a slash command joining a
+    background refresh) starts its own, which later callers then share.
+    """
+
+    def __init__(self, rcon, ttl=15):
+        self.rcon = rcon
+        self.ttl = ttl
+        self.details = None
+        self.raw = None
+        self.fetched_at = 0.0
+        self.requested_at = 0.0
+        self._inflight = None
+        self._inflight_priority = None
+
+    @property
+    def age(self):
+        return time.monotonic() - self.fetched_at
+
+    async def get(self, max_age=None, priority=PRIORITY_BACKGROUND):
+        max_age = self.ttl if max_age is None else max_age
+        if self.details is not None and self.age < max_age:
+            return self.details
+        # Lower values are served first by the RCON scheduler.
+        if self._inflight is None or priority < self._inflight_priority:
+            self._inflight = asyncio.ensure_future(self._refresh(priority))
+            self._inflight_priority = priority
+            self._inflight.add_done_callback(self._clear_inflight)
+        # Shield so one caller being cancelled does not cancel the shared request.
+        return await asyncio.shield(self._inflight)
+
+    def _clear_inflight(self, future):
+        # A request that was overtaken by a higher priority one leaves the newer one in place.
+        if self._inflight is future:
+            self._inflight = None
+            self._inflight_priority = None
+
+    async def _refresh(self, priority):
+        requested_at = time.monotonic()
+        try:
+            response = await self.rcon.send(RCON_SERVERDETAILS, priority=priority)
+        except RconUnavailable:
+            return None
+        except Exception as e:
+            logging.error(f"Error retrieving server info: {e}")
+            return None
+        details = parse_server_details(response)
+        if requested_at < self.requested_at:
+            # An overtaken request answered after the one that replaced it; keep the newer details.
+            return details
+        self.raw = response
+        if details is None:
+            logging.warning("Server details did not match the expected response format.")
+            return None
+        self.details = details
+        self.requested_at = requested_at
+        self.fetched_at = time.monotonic()
+        return details
+
+    def invalidate(self):
+        self.fetched_at = 0.0
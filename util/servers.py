@@ -0,0 +1,170 @@
+import asyncio
+import json
+import logging
+import os
+from util import config
+from util.health import EndpointHealth
+from util.logtail import LogTailer
+from util.offsets import OffsetStore
+from util.sftp import SftpPool
+from util.rcon import RconPool
+from util.serverinfo import ServerDetailsCache
+
+CHANNEL_KEYS = ["chatlog", "spatialchat", "killfeed", "adminlog", "dinotracker"]
+
+# Settings not given in servers.json fall back to the environment.
+DEFAULT_SETTINGS = {
+    "name": config.SERVER_NAME,
+    "rcon_host": config.RCON_HOST,
+    "rcon_port": config.RCON_PORT,
+    "rcon_pass": config.RCON_PASS,
+    "ftp_host": config.FTP_HOST,
+    "ftp_port": config.FTP_PORT,
+    "ftp_user": config.FTP_USER,
+    "ftp_pass": config.FTP_PASS,
+    "file_path": config.FILE_PATH,
+    "local_file_path": config.LOCAL_LOG_PATH,
+    "admin_file_path": config.ADMIN_FILE_PATH,
+    "chatlog_channel": config.CHATLOG_CHANNEL,
+    "spatialchat_channel": config.SPATIALCHAT_CHANNEL,
+    "killfeed_channel": config.KILLFEED_CHANNEL,
+    "adminlog_channel": config.ADMINLOG_CHANNEL,
+    "dinotracker_channel": config.DINOTRACKER_CHANNEL,
+}
+
+def load_server_settings(path=config.SERVERS_FILE):
+    if not path or not os.path.exists(path):
+        return [dict(DEFAULT_SETTINGS)]
+    with open(path, "r", encoding="utf-8") as file:
+        entries = json.load(file)
+    settings = []
+    for index, entry in enumerate(entries):
+        defaults = dict(DEFAULT_SETTINGS)
+        if index > 0:
+            # Only the first server inherits the channels from the environment,
+            # otherwise every server would post into the same feeds.
+            defaults.update({f"{key}_channel": 0 for key in CHANNEL_KEYS})
+            # The same goes for a local log: it is one file on this machine.
+            defaults["local_file_path"] = ""
+        settings.append({**defaults, **entry})
+    return settings
+
+SERVER_SETTINGS = load_server_settings()
+SERVER_NAMES = [settings["name"] for settings in SERVER_SETTINGS]
+
+def create_health(name):
+    return EndpointHealth(
+        name,
+        failure_threshold=config.HEALTH_FAILURE_THRESHOLD,
+        base_delay=config.HEALTH_BACKOFF_BASE,
+        max_delay=config.HEALTH_BACKOFF_MAX
+    )
+
+class GameServer:
+    """One Isle server with its own RCON pool, caches, SFTP details and feed channels."""
+
+    def __init__(self, settings, offsets=None):
+        self.name = settings["name"]
+        self.ftp_host = settings["ftp_host"]
+        self.ftp_port = int(settings["ftp_port"])
+        self.ftp_username = settings["ftp_user"]
+        self.ftp_password = settings["ftp_pass"]
+        self.file_path = settings["file_path"]
+        self.local_file_path = settings.get("local_file_path") or None
+        self.admin_file_path = settings["admin_file_path"]
+        self.channels = {key: int(settings.get(f"{key}_channel") or 0) for key in CHANNEL_KEYS}
+        self.rcon = RconPool(
+            settings["rcon_host"],
+            int(settings["rcon_port"]),
+            settings["rcon_pass"],
+            size=config.RCON_POOL_SIZE,
+            keepalive=config.RCON_KEEPALIVE,
+            timeout=config.RCON_TIMEOUT,
+            rate=config.RCON_RATE,
+            opcode_limits=config.RCON_OPCODE_LIMITS,
+            health=create_health(f"{self.name} RCON")
+        )
+        self.server_details = ServerDetailsCache(self.rcon, ttl=config.SERVERINFO_TTL)
+        self.sftp_health = create_health(f"{self.name} SFTP")
+        self.sftp = SftpPool(
+            self.ftp_host,
+            self.ftp_port,
+            self.ftp_username,
+            self.ftp_password,
+            size=config.SFTP_POOL_SIZE,
+            keepalive=config.SFTP_KEEPALIVE,
+            timeout=config.SFTP_TIMEOUT,
+            health=self.sftp_health
+        )
+        self.log = LogTailer(
+            self,
+            interval=config.LOG_POLL_INTERVAL,
+            min_interval=config.LOG_POLL_MIN,
+            max_interval=config.LOG_POLL_MAX,
+            offsets=offsets,
+            local_path=self.local_file_path
+        )
+
+class ServerRegistry:
+    def __init__(self, settings=SERVER_SETTINGS, offsets_file=config.LOG_OFFSETS_FILE):
+        self.servers = {}
+        self.offsets = OffsetStore(offsets_file)
+        for entry in settings:
+            server = GameServer(entry, self.offsets)
+            self.servers[server.name] = server
+        self.default = next(iter(self.servers.values()))
+
+    def __iter__(self):
+        return iter(self.servers.values())
+
+    def __len__(self):
+        return len(self.servers)
+
+    def get(self, name=None):
+        if name is None:
+            return self.default
+        return self.servers[name]
+
+    def by_channel(self, key, channel_id):
+        return next((server for server in self if server.channels.get(key) == channel_id), None)
+
+class ServerPoller:
+    """
+    Runs one poll per server on every tick of a loop.
+
+    Each server gets its own task, so a slow or unreachable server never
+    delays the others. A server whose previous poll is still running is
+    skipped for this tick rather than queued up behind itself.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.tasks = {}
+
+    def poll(self, servers, func):
+        for server in servers:
+            task = self.tasks.get(server.name)
+            if task is not None and not task.done():
+                logging.info(f"{self.name}: previous poll of {server.name} still running, skipping.")
+                continue
+            self.tasks[server.name] = asyncio.ensure_future(self._run(server, func))
+
+    async def _run(self, server, func):
+        try:
+            await func(server)
+        except Exception as e:
+            logging.error(f"{self.name}: error polling {server.name}: {e}")
+
+    def cancel(self):
+        for task in self.tasks.values():
+            task.cancel()
+
+def server_option():
+    """Optional slash command parameter for picking a configured server."""
+    import nextcord
+    return nextcord.SlashOption(
+        description="Game server to use, defaults to the first configured server.",
+        choices=SERVER_NAMES,
+        required=False,
+        default=None
+    )
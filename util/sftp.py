@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+import paramiko
+from util.health import EndpointHealth
+
+class SftpSession:
+    """One SSH transport with an SFTP channel, opened on first use and reused until it breaks."""
+
+    def __init__(self, host, port, username, password, keepalive=30, timeout=10):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.keepalive = keepalive
+        self.timeout = timeout
+        self.transport = None
+        self.sftp = None
+
+    @property
+    def connected(self):
+        return self.transport is not None and self.transport.is_active()
+
+    def connect(self):
+        self.close()
+        # Open the socket ourselves: paramiko.Transport((host, port)) waits on the OS TCP timeout.
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        transport = paramiko.Transport(sock)
+        transport.banner_timeout = self.timeout
+        transport.auth_timeout = self.timeout
+        try:
+            transport.connect(username=self.username, password=self.password)
+            if self.keepalive:
+                transport.set_keepalive(self.keepalive)
+            self.sftp = paramiko.SFTPClient.from_transport(transport)
+            self.sftp.get_channel().settimeout(self.timeout)
+        except Exception:
+            transport.close()
+            raise
+        self.transport = transport
+
+    def close(self):
+        sftp, transport, self.sftp, self.transport = self.sftp, self.transport, None, None
+        if sftp is not None:
+            try:
+                sftp.close()
+            except Exception:
+                pass
+        if transport is not None:
+            transport.close()
+
+class SftpPool:
+    """
+    Long-lived SFTP sessions shared by the log tailer and the Game.ini editor.
+
+    The SSH handshake happens when a session is first used and again only
+    after it broke. Paramiko keepalives stop idle sessions from being
+    dropped, and a health check closes sessions whose transport died so
+    the next caller reconnects. Like RconPool, calls are refused straight
+    away while `health` reports the server as down.
+
+    All blocking paramiko work, connecting included, runs on the pool's own
+    worker threads, so an unreachable host never stalls the event loop or
+    the default executor other code shares.
+    """
+
+    def __init__(self, host, port, username, password, size=2, keepalive=30, timeout=10, health=None):
+        self.host = host
+        self.port = port
+        self.size = max(1, size)
+        self.keepalive = keepalive
+        self.health = health or EndpointHealth("SFTP")
+        self._sessions = [
+            SftpSession(host, port, username, password, keepalive=keepalive, timeout=timeout)
+            for _ in range(self.size)
+        ]
+        self._idle = None
+        self._health_task = None
+        # One thread per session plus one so closing never waits behind a hung read.
+        self._executor = ThreadPoolExecutor(max_workers=self.size + 1, thread_name_prefix=f"sftp-{host}")
+
+    async def _blocking(self, func, *args, **kwargs):
+        return await asyncio.get_event_loop().run_in_executor(self._executor, lambda: func(*args, **kwargs))
+
+    def _start(self):
+        if self._idle is not None:
+            return
+        self._idle = asyncio.LifoQueue()
+        for session in self._sessions:
+            self._idle.put_nowait(session)
+        if self.keepalive:
+            self._health_task = asyncio.ensure_future(self._health_loop())
+
+    @asynccontextmanager
+    async def session(self):
+        """Lease one connected session exclusively."""
+        self._start()
+        session = await self._idle.get()
+        try:
+            if not session.connected:
+                await self._blocking(session.connect)
+            yield session
+        finally:
+            self._idle.put_nowait(session)
+
+    async def run(self, operation, *args, **kwargs):
+        """Run `operation(sftp, *args, **kwargs)` in a worker thread on a pooled session."""
+        self.health.check()
+        session = None
+        try:
+            async with self.session() as session:
+                try:
+                    result = await self._blocking(operation, session.sftp, *args, **kwargs)
+                except Exception:
+                    if session.connected:
+                        # The server answered, the operation itself failed (e.g. a missing file).
+                        raise
+                    # The session broke under us; reconnect and try once more.
+                    logging.info(f"SFTP session to {self.host}:{self.port} dropped, reconnecting.")
+                    await self._blocking(session.connect)
+                    result = await self._blocking(operation, session.sftp, *args, **kwargs)
+        except Exception as e:
+            # Only count failures to reach the server, not operations it refused.
+            if session is None or not session.connected:
+                self.health.record_failure(e)
+            raise
+        self.health.record_success()
+        return result
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.keepalive)
+            # Only look at sessions nobody is using right now.
+            idle = []
+            while not self._idle.empty():
+                idle.append(self._idle.get_nowait())
+            for session in idle:
+                if session.transport is not None and not session.connected:
+                    logging.info(f"SFTP session to {self.host}:{self.port} went away, reconnecting on next use.")
+                    await self._blocking(session.close)
+                self._idle.put_nowait(session)
+
+    async def close(self):
+        if self._health_task:
+            self._health_task.cancel()
+            self._health_task = None
+        for session in self._sessions:
+            await self._blocking(session.close)
+        self._executor.shutdown(wait=False)
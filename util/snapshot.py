@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from util.rcon import RCON_GETPLAYERLIST, RCON_GETPLAYERDATA, PRIORITY_BACKGROUND
+from util.parsers import parse_player_list, parse_player_data
+
+@dataclass
+class PlayerSnapshot:
+    players: dict = field(default_factory=dict)  # {steam_id: PlayerData}
+    online: dict = field(default_factory=dict)  # {steam_id: name} from the player list
+    taken_at: float = 0.0
+    duration: float = 0.0
+    bulk: bool = False
+
+    @property
+    def missing(self):
+        return set(self.online) - set(self.players)
+
+    @property
+    def complete(self):
+        return not self.missing
+
+async def take_player_snapshot(rcon, deadline=45, concurrency=None):
+    """
+    Collect GETPLAYERDATA for everyone online.
+
+    A single 0x77 without an ID asks the server for every player at once.
+    Players missing from that reply are fetched individually with at most
+    `concurrency` requests in flight (by default the pool size), never more
+    than the pool's 0x77 opcode limit lets run at once. The player list, the bulk request and
+    the fallback share one `deadline`: whatever has arrived when it passes
+    is returned and the rest is left in `missing`. Without a player list
+    there is nothing to return, so running out of time for it raises
+    asyncio.TimeoutError.
+    """
+    started = time.monotonic()
+    snapshot = PlayerSnapshot(taken_at=time.time())
+
+    def remaining():
+        return max(0.0, deadline - (time.monotonic() - started))
+
+    player_list = parse_player_list(
+        await asyncio.wait_for(rcon.send(RCON_GETPLAYERLIST, priority=PRIORITY_BACKGROUND), remaining())
+    )
+    snapshot.online = {entry.steam_id: entry.name for entry in player_list}
+    if not snapshot.online:
+        snapshot.duration = time.monotonic() - started
+        return snapshot
+
+    try:
+        bulk = parse_player_data(
+            await asyncio.wait_for(rcon.send(RCON_GETPLAYERDATA, priority=PRIORITY_BACKGROUND), remaining())
+        )
+    except asyncio.TimeoutError:
+        logging.warning(f"Player snapshot deadline hit waiting for the bulk player data of {len(snapshot.online)} players.")
+        snapshot.duration = time.monotonic() - started
+        return snapshot
+    except Exception as e:
+        logging.warning(f"Bulk player data request failed: {e}")
+        bulk = {}
+    snapshot.players = {steam_id: data for steam_id, data in bulk.items() if steam_id in snapshot.online}
+    snapshot.bulk = bool(snapshot.players)
+
+    missing = snapshot.missing
+    if missing:
+        concurrency = concurrency or getattr(rcon, 'size', 4)
+        scheduler = getattr(rcon, 'scheduler', None)
+        limit = scheduler.opcode_limits.get(RCON_GETPLAYERDATA) if scheduler is not None else None
+        if limit:
+            # More would only queue in the scheduler behind the opcode limit.
+            concurrency = min(concurrency, limit)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(steam_id):
+            async with semaphore:
+                data = parse_player_data(await rcon.send(RCON_GETPLAYERDATA, steam_id, priority=PRIORITY_BACKGROUND))
+            if steam_id in data:
+                snapshot.players[steam_id] = data[steam_id]
+
+        tasks = [asyncio.ensure_future(fetch(steam_id)) for steam_id in missing]
+        done, pending = await asyncio.wait(tasks, timeout=remaining())
+        for task in pending:
+            task.cancel()
+        failed = [task.exception() for task in done if task.exception()]
+        if failed:
+            logging.warning(f"{len(failed)} player data requests failed, first error: {failed[0]}")
+        if pending:
+            logging.warning(f"Player snapshot deadline hit with {len(pending)} players outstanding.")
+
+    snapshot.duration = time.monotonic() - started
+    return snapshot
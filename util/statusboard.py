@@ -0,0 +1,98 @@
+import hashlib
+import json
+import logging
+import time
+import nextcord
+
+def embed_fingerprint(embed):
+    """Hash of what an embed shows, leaving out the footer and timestamp that change on every render."""
+    content = embed.to_dict()
+    content.pop("footer", None)
+    content.pop("timestamp", None)
+    return hashlib.sha1(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+class StatusBoard:
+    """
+    Status messages edited in place, and only when what they show changed.
+
+    Each message is addressed by a key. Its channel, message ID and the
+    fingerprint of the last embed posted are kept in `store` (an
+    OffsetStore), so after a restart the message is edited through a
+    PartialMessage without fetching it or scanning the channel history.
+    A key with nothing saved (the first start after upgrading) takes over
+    the newest message in the channel if the bot sent it, as the
+    DinoTracker did before. A message is edited at most once every `min_interval` seconds; a
+    change that comes sooner is posted on a later update.
+    """
+
+    def __init__(self, store, min_interval=30):
+        self.store = store
+        self.min_interval = min_interval
+        self.messages = {}
+        self.edited_at = {}
+        self.scanned = set()
+
+    def _due(self, key, embed):
+        fingerprint = embed_fingerprint(embed)
+        saved = self.store.get(key) or {}
+        if saved.get("hash") == fingerprint:
+            return None
+        if time.monotonic() - self.edited_at.get(key, float("-inf")) < self.min_interval:
+            return None
+        return fingerprint
+
+    def _message(self, key, channel, message_id):
+        message = self.messages.get(key)
+        if message is None or message.id != message_id or message.channel.id != channel.id:
+            message = self.messages[key] = channel.get_partial_message(message_id)
+        return message
+
+    async def _previous(self, key, channel):
+        """The bot's message at the end of `channel`, looked for once per key."""
+        if key in self.scanned:
+            return None
+        self.scanned.add(key)
+        try:
+            async for message in channel.history(limit=1):
+                if message.author.id == channel.guild.me.id:
+                    return message
+        except nextcord.HTTPException as e:
+            logging.warning(f"Could not read the history of #{channel} for status message {key}: {e}")
+        return None
+
+    def _saved(self, key, channel, message_id, fingerprint):
+        self.edited_at[key] = time.monotonic()
+        self.store.set(key, {"channel_id": channel.id, "message_id": message_id, "hash": fingerprint})
+
+    async def post(self, key, channel, embed):
+        """Keep the message `key` in `channel` showing `embed`, sending it first if needed."""
+        fingerprint = self._due(key, embed)
+        if fingerprint is None:
+            return False
+        saved = self.store.get(key) or {}
+        if saved.get("message_id") and saved.get("channel_id") == channel.id:
+            try:
+                await self._message(key, channel, saved["message_id"]).edit(embed=embed)
+                self._saved(key, channel, saved["message_id"], fingerprint)
+                return True
+            except nextcord.NotFound:
+                logging.info(f"Status message {key} was deleted, sending a new one.")
+            message = None
+        else:
+            message = await self._previous(key, channel)
+        if message is not None:
+            await message.edit(embed=embed)
+        else:
+            message = await channel.send(embed=embed)
+        self.messages[key] = message
+        self._saved(key, channel, message.id, fingerprint)
+        return True
+
+    async def edit(self, key, channel, message_id, embed):
+        """Show `embed` in an existing message, e.g. one saved by a slash command."""
+        fingerprint = self._due(key, embed)
+        if fingerprint is None:
+            return False
+        await self._message(key, channel, message_id).edit(embed=embed)
+        self._saved(key, channel, message_id, fingerprint)
+        return True
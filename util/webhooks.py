@@ -0,0 +1,76 @@
+import logging
+import aiohttp
+import nextcord
+
+WEBHOOK_NAME = "Isle Feed"
+
+class WebhookPool:
+    """
+    Webhooks the feed channels listed in `feeds` are posted through instead of the bot user.
+
+    Webhook messages have their own rate limits per webhook, apart from the
+    bot's buckets, so `size` webhooks per channel post in parallel without
+    slowing down slash command replies or status edits. The webhooks are
+    looked up (or created, which needs Manage Webhooks) on first use and
+    share one aiohttp session. A channel where that fails keeps using the
+    bot user.
+    """
+
+    def __init__(self, bot, feeds, size=2):
+        self.bot = bot
+        self.feeds = set(feeds)
+        self.size = max(1, size)
+        self.session = None
+        self.webhooks = {}
+
+    def enabled_for(self, feed):
+        return feed in self.feeds
+
+    def _session(self):
+        if self.session is None:
+            self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit_per_host=self.size * 4))
+        return self.session
+
+    async def senders(self, channel):
+        """One send(content=None, embeds=None) coroutine function per webhook of `channel`."""
+        webhooks = self.webhooks.get(channel.id)
+        if webhooks is None:
+            try:
+                webhooks = await self._load(channel)
+            except nextcord.HTTPException as e:
+                logging.warning(f"Cannot use webhooks in #{channel}, posting as the bot instead: {e}")
+                webhooks = []
+            self.webhooks[channel.id] = webhooks
+        return [self._sender(webhook) for webhook in webhooks]
+
+    async def _load(self, channel):
+        existing = [
+            webhook for webhook in await channel.webhooks()
+            if webhook.name == WEBHOOK_NAME and webhook.token
+        ]
+        while len(existing) < self.size:
+            existing.append(await channel.create_webhook(name=WEBHOOK_NAME))
+        # Rebind to our own session so webhook traffic gets its own connection pool.
+        return [
+            nextcord.Webhook.partial(webhook.id, webhook.token, session=self._session())
+            for webhook in existing[:self.size]
+        ]
+
+    def _sender(self, webhook):
+        async def send(content=None, embeds=None):
+            user = self.bot.user
+            kwargs = {"username": user.display_name, "avatar_url": user.display_avatar.url} if user else {}
+            if content is not None:
+                kwargs["content"] = content
+            if embeds is not None:
+                kwargs["embeds"] = embeds
+            await webhook.send(**kwargs)
+        return send
+
+    async def close(self):
+        """Called by `DiscordOutbox.close` when the bot shuts down."""
+        # The cached webhooks are bound to the session closed here.
+        self.webhooks = {}
+        if self.session is not None:
+            await self.session.close()
+            self.session = None